@@ -0,0 +1,112 @@
+"""
+Bulk-load helpers using PostgreSQL binary COPY.
+
+psycopg2 has no binary COPY writer, so rows are encoded here in the
+PGCOPY format and streamed with copy_expert. Embeddings go over the wire
+as packed fp16 values (the halfvec column type) instead of
+'[0.1,0.2,...]' text literals.
+"""
+import io
+import struct
+import uuid
+from typing import Iterable, Tuple
+
+import numpy as np
+
+# Signature, flags field, header extension length
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_COPY_TRAILER = struct.pack("!h", -1)
+
+_COPY_CHUNKS_SQL = (
+    "COPY chunks (id, document_id, chunk_index, content, embedding) "
+    "FROM STDIN WITH (FORMAT BINARY)"
+)
+
+# Per row: field count, then (length, value) for id, document_id, chunk_index
+_CHUNK_ROW_PREFIX = struct.Struct("!hi16si16sii")
+
+# Cache rows are staged in a per-connection temp table so the final insert
+# can skip keys another upload wrote first (COPY has no ON CONFLICT)
+_CREATE_CACHE_STAGE_SQL = (
+    "CREATE TEMP TABLE IF NOT EXISTS embedding_cache_stage "
+    "(LIKE embedding_cache) ON COMMIT DELETE ROWS"
+)
+_COPY_CACHE_STAGE_SQL = (
+    "COPY embedding_cache_stage (hash, model, embedding) "
+    "FROM STDIN WITH (FORMAT BINARY)"
+)
+_MERGE_CACHE_STAGE_SQL = (
+    "INSERT INTO embedding_cache (hash, model, embedding) "
+    "SELECT hash, model, embedding FROM embedding_cache_stage "
+    "ON CONFLICT DO NOTHING"
+)
+
+
+def _halfvec_field(vec) -> bytes:
+    """Encode one embedding as a length-prefixed pgvector halfvec binary value."""
+    # halfvec_recv layout: int16 dim, int16 unused, float2[dim], all big-endian
+    arr = np.asarray(vec, dtype=">f2")
+    dim = arr.shape[0]
+    return struct.pack("!ihh", 4 + 2 * dim, dim, 0) + arr.tobytes()
+
+
+def decode_halfvec(value) -> np.ndarray:
+    """Decode a halfvec_send() value into a float32 array."""
+    dim = struct.unpack_from("!h", value)[0]
+    return np.frombuffer(value, dtype=">f2", count=dim, offset=4).astype(np.float32)
+
+
+def copy_chunks(connection, rows: Iterable[Tuple[uuid.UUID, uuid.UUID, int, str, np.ndarray]]) -> None:
+    """
+    Load chunk rows with a single binary COPY.
+
+    Args:
+        connection: SQLAlchemy Connection inside the caller's transaction
+        rows: (id, document_id, chunk_index, content, embedding) tuples
+    """
+    buf = io.BytesIO()
+    buf.write(_COPY_HEADER)
+    for chunk_id, doc_id, idx, content, vec in rows:
+        content_bytes = content.encode("utf-8")
+        buf.write(_CHUNK_ROW_PREFIX.pack(
+            5,
+            16, chunk_id.bytes,
+            16, doc_id.bytes,
+            4, idx,
+        ))
+        buf.write(struct.pack("!i", len(content_bytes)))
+        buf.write(content_bytes)
+        buf.write(_halfvec_field(vec))
+    buf.write(_COPY_TRAILER)
+    buf.seek(0)
+
+    with connection.connection.cursor() as cur:
+        cur.copy_expert(_COPY_CHUNKS_SQL, buf)
+
+
+def copy_embedding_cache(connection, model: str, rows: Iterable[Tuple[bytes, np.ndarray]]) -> None:
+    """
+    Add embeddings to embedding_cache with one binary COPY, keeping existing keys.
+
+    Args:
+        connection: SQLAlchemy Connection inside the caller's transaction
+        model: Encoder identifier stored with every row
+        rows: (content hash, embedding) pairs
+    """
+    model_bytes = model.encode("utf-8")
+    model_field = struct.pack("!i", len(model_bytes)) + model_bytes
+
+    buf = io.BytesIO()
+    buf.write(_COPY_HEADER)
+    for digest, vec in rows:
+        buf.write(struct.pack("!hi", 3, len(digest)))
+        buf.write(digest)
+        buf.write(model_field)
+        buf.write(_halfvec_field(vec))
+    buf.write(_COPY_TRAILER)
+    buf.seek(0)
+
+    with connection.connection.cursor() as cur:
+        cur.execute(_CREATE_CACHE_STAGE_SQL)
+        cur.copy_expert(_COPY_CACHE_STAGE_SQL, buf)
+        cur.execute(_MERGE_CACHE_STAGE_SQL)
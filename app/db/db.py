@@ -1,4 +1,6 @@
 import os
+
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -11,5 +13,26 @@ POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
 DATABASE_URL = f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Connection pool sizing; LIFO reuses the most recently returned (warm)
+# connection and lets surplus idle ones age out
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+
+def _json_dumps(obj) -> str:
+    """JSON serializer for JSON/JSONB binds (psycopg2 expects str)."""
+    return orjson.dumps(obj).decode()
+
+
+# JSON/JSONB values are encoded and decoded with orjson in both directions
+engine = create_engine(
+    DATABASE_URL,
+    json_serializer=_json_dumps,
+    json_deserializer=orjson.loads,
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
@@ -4,12 +4,15 @@ Database migration utilities.
 import os
 from sqlalchemy import text
 from . import engine
+from ..logging_config import logger
 
 
 def run_sql_migrations():
     """
     Run all SQL migration files in the migrations directory.
     
+    All files are executed as a single batch inside one transaction.
+    
     Migration files should:
     - Be named with a sortable prefix (e.g., 001_initial.sql, 002_add_columns.sql)
     - End with .sql extension
@@ -22,10 +25,9 @@ def run_sql_migrations():
     # Assuming migrations/ is at the same level as app/
     app_dir = os.path.dirname(__file__)
     migrations_dir = os.path.join(app_dir, "scripts")
-    print("migration dir", migrations_dir)
     
     if not os.path.exists(migrations_dir):
-        print(f"Warning: Migrations directory not found at {migrations_dir}")
+        logger.warning("Migrations directory not found", path=migrations_dir)
         return
     
     # Get all .sql files and sort them
@@ -35,20 +37,20 @@ def run_sql_migrations():
     )
     
     if not migration_files:
-        print("No migration files found")
+        logger.warning("No migration files found", path=migrations_dir)
         return
     
-    # Execute each migration
+    # Read every file up front and send them as one multi-statement batch:
+    # a single round-trip and parse regardless of how many files there are.
+    # Files are concatenated in sorted order, so ordering is preserved.
+    scripts = []
+    for filename in migration_files:
+        filepath = os.path.join(migrations_dir, filename)
+        with open(filepath, "r", encoding="utf-8") as f:
+            scripts.append(f"-- {filename}\n{f.read()}")
+    
     with engine.begin() as conn:
-        print("migration_files", migration_files)
-        for filename in migration_files:
-            filepath = os.path.join(migrations_dir, filename)
-            print(f"Running migration: {filename}")
-            
-            with open(filepath, "r", encoding="utf-8") as f:
-                sql = f.read()
-            
-            conn.execute(text(sql))
-            print(f"✓ Completed: {filename}")
-    
-    print(f"Successfully executed {len(migration_files)} migration(s)")
+        logger.info("Applying migrations", files=migration_files)
+        conn.execute(text("\n;\n".join(scripts)))
+    
+    logger.info("Migrations applied", count=len(migration_files))
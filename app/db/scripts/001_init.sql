@@ -17,9 +17,8 @@ CREATE TABLE IF NOT EXISTS chunks (
   embedding VECTOR(384) NOT NULL
 );
 
--- Vector index (pgvector IVF/flat). IVF is great for >50k rows; start flat first:
+-- Vector index lives in 005_hnsw_index.sql
 CREATE INDEX IF NOT EXISTS idx_chunks_doc ON chunks(document_id);
-CREATE INDEX IF NOT EXISTS idx_chunks_embedding ON chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
 
 
 -- To store the user and system messages
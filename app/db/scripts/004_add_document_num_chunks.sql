@@ -0,0 +1,30 @@
+-- Migration to store the chunk count on each document
+-- Chunks are written once per document at upload time, so the upload
+-- handler sets num_chunks directly and listing no longer aggregates chunks.
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_name = 'documents'
+        AND column_name = 'num_chunks'
+    ) THEN
+        ALTER TABLE documents
+        ADD COLUMN num_chunks INTEGER NOT NULL DEFAULT 0;
+
+        -- Backfill counts for documents uploaded before this migration
+        UPDATE documents d
+        SET num_chunks = c.cnt
+        FROM (
+            SELECT document_id, COUNT(*) AS cnt
+            FROM chunks
+            GROUP BY document_id
+        ) c
+        WHERE c.document_id = d.id;
+    END IF;
+END $$;
+
+-- Document listing is ordered by upload time
+CREATE INDEX IF NOT EXISTS idx_documents_uploaded_at
+ON documents(uploaded_at DESC);
@@ -0,0 +1,23 @@
+-- Migration to replace the IVFFlat embedding index with HNSW
+-- IVFFlat built on an empty table has useless centroids, so searches fell
+-- back to scanning every chunk. HNSW needs no training and matches the
+-- cosine operator (<=>) used for ordering in retrieval.
+-- Only applies while the column is still fp32 vector; later migrations
+-- replace this index (see 006/007).
+
+DROP INDEX IF EXISTS idx_chunks_embedding;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_name = 'chunks'
+        AND column_name = 'embedding'
+        AND udt_name = 'vector'
+    ) THEN
+        CREATE INDEX IF NOT EXISTS idx_chunks_embedding_hnsw
+        ON chunks USING hnsw (embedding vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64);
+    END IF;
+END $$;
@@ -0,0 +1,23 @@
+-- Migration to store chunk embeddings as halfvec (fp16, pgvector >= 0.7)
+-- Halves on-disk size and the bytes read per distance computation;
+-- cosine ranking of unit vectors is unaffected at fp16 precision.
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_name = 'chunks'
+        AND column_name = 'embedding'
+        AND udt_name = 'vector'
+    ) THEN
+        DROP INDEX IF EXISTS idx_chunks_embedding_hnsw;
+
+        ALTER TABLE chunks
+        ALTER COLUMN embedding TYPE halfvec(384) USING embedding::halfvec(384);
+
+        CREATE INDEX idx_chunks_embedding_hnsw
+        ON chunks USING hnsw (embedding halfvec_cosine_ops)
+        WITH (m = 16, ef_construction = 64);
+    END IF;
+END $$;
@@ -0,0 +1,11 @@
+-- Migration to index binary-quantized embeddings for candidate pre-filtering
+-- Retrieval shortlists candidates by Hamming distance over 384-bit sign
+-- vectors (48 bytes each), then reranks them by exact halfvec cosine.
+-- The expression index means no extra column has to be written on upload.
+
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_bin_hnsw
+ON chunks USING hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Searches no longer order by the halfvec index; drop it to save write cost
+DROP INDEX IF EXISTS idx_chunks_embedding_hnsw;
@@ -0,0 +1,11 @@
+-- Migration to cache chunk embeddings by content hash
+-- Re-uploaded or overlapping documents reuse the stored vector of any chunk
+-- text seen before instead of running it through the encoder again.
+-- model identifies the encoder (name and backend) that produced the vector.
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    hash BYTEA NOT NULL,
+    model TEXT NOT NULL,
+    embedding halfvec(384) NOT NULL,
+    PRIMARY KEY (hash, model)
+);
@@ -0,0 +1,7 @@
+-- Migration to track indexing state per document
+-- Uploads return once the document rows exist; chunks are embedded and
+-- stored afterwards, flipping status from 'processing' to 'ready' (or
+-- 'failed'). Documents from before this migration are already indexed.
+
+ALTER TABLE documents
+ADD COLUMN IF NOT EXISTS status TEXT NOT NULL DEFAULT 'ready';
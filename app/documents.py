@@ -3,42 +3,55 @@ from fastapi import APIRouter, HTTPException
 from sqlalchemy import text as sa_text
 
 from .db import engine, SessionLocal
+from .services.rag_service import clear_answer_cache
+from .state import bump_corpus_version, invalidate_has_documents
 
 router = APIRouter(prefix="/api", tags=["documents"])
 
-@router.get("/documents")
+_LIST_DOCS_SQL = sa_text("""
+    SELECT id,
+           filename,
+           mime_type,
+           size_bytes,
+           uploaded_at,
+           num_chunks,
+           status
+    FROM documents
+    ORDER BY uploaded_at DESC
+""")
+_DOC_EXISTS_SQL = sa_text("SELECT 1 FROM documents WHERE id = :id")
+_DELETE_CHUNKS_SQL = sa_text("DELETE FROM chunks WHERE document_id = :id")
+_DELETE_DOC_SQL = sa_text("DELETE FROM documents WHERE id = :id")
+
+# response_model=None: the List[Dict] annotation would otherwise make FastAPI
+# build a response model and re-validate every row
+@router.get("/documents", response_model=None)
 def list_documents() -> List[Dict]:
     """
-    Returns all documents with chunk counts.
+    Returns all documents with chunk counts and indexing status.
     """
     with engine.begin() as conn:
-        rows = conn.execute(sa_text("""
-            SELECT d.id,
-                   d.filename,
-                   d.mime_type,
-                   d.size_bytes,
-                   d.uploaded_at,
-                   COALESCE(COUNT(c.id), 0) AS num_chunks
-            FROM documents d
-            LEFT JOIN chunks c ON c.document_id = d.id
-            GROUP BY d.id
-            ORDER BY d.uploaded_at DESC
-        """)).mappings().all()
+        rows = conn.execute(_LIST_DOCS_SQL).mappings().all()
     return [dict(r) for r in rows]
 
 
 @router.delete("/documents/{doc_id}")
 def delete_document(doc_id: str):
     """
-    Deletes a document and all its chunks (ON DELETE CASCADE).
+    Deletes a document and all its chunks.
     """
     with SessionLocal() as db, db.begin():
         # verify document exists
-        res = db.execute(sa_text("SELECT 1 FROM documents WHERE id = :id"), {"id": doc_id}).first()
+        res = db.execute(_DOC_EXISTS_SQL, {"id": doc_id}).first()
         if not res:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        # delete document → chunks will cascade
-        db.execute(sa_text("DELETE FROM documents WHERE id = :id"), {"id": doc_id})
+        # delete chunks in one set-based statement (index on chunks.document_id)
+        # rather than leaving thousands of rows to the per-row cascade
+        db.execute(_DELETE_CHUNKS_SQL, {"id": doc_id})
+        db.execute(_DELETE_DOC_SQL, {"id": doc_id})
 
+    clear_answer_cache()
+    invalidate_has_documents()
+    bump_corpus_version()
     return {"ok": True, "deleted": doc_id}
@@ -1,39 +1,217 @@
 import os
+import platform
+import threading
 from typing import List
 import numpy as np
 import warnings
 
+from .logging_config import logger
+
 # Default: local sentence-transformers to avoid extra API usage
 _EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+# "onnx" runs a dynamically quantized INT8 export on ONNX Runtime (CPU);
+# "torch" keeps the original FP32 SentenceTransformer.
+_EMBED_BACKEND = os.getenv("EMBED_BACKEND", "onnx").lower()
+
+
+def _detect_quantization() -> str:
+    """
+    Pick the sentence-transformers quantization preset for this CPU.
+
+    The AVX-512 VNNI preset only pays off on CPUs with VNNI and can saturate
+    activations elsewhere, so it is chosen only when the flag is present;
+    anything unrecognised falls back to "avx2".
+    """
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = next((line.split(":", 1)[1].split() for line in f if line.startswith("flags")), [])
+    except OSError:
+        return "avx2"
+    if "avx512_vnni" in flags:
+        return "avx512_vnni"
+    if "avx512f" in flags:
+        return "avx512"
+    return "avx2"
+
+
+# One of the sentence-transformers presets: "arm64", "avx2", "avx512",
+# "avx512_vnni"; detected from the CPU unless set
+_ONNX_QUANTIZATION = os.getenv("EMBED_ONNX_QUANTIZATION") or _detect_quantization()
+_ONNX_CACHE_DIR = os.getenv("EMBED_ONNX_CACHE_DIR", os.path.expanduser("~/.cache/docs-chat/onnx"))
+# Forward-pass slice size; uploads hand over every chunk in one call
+_EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# Intra-op threads for CPU inference; 0 = the CPUs this process may run on
+# (os.cpu_count() reports the host's CPUs, not the container's share)
+_EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0")) or (
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+)
+
 _model = None
+# Model name plus the backend/precision actually loaded; identifies vectors
+# from this encoder in the embedding cache (see embedding_cache_label)
+_model_label = None
+# Loading happens in a background thread at startup; callers that need the
+# model before it's ready block on the lock until loading finishes.
+_load_lock = threading.Lock()
+model_ready = threading.Event()
+
+
+def _detect_device() -> str:
+    """Pick the best available torch device (cuda, mps or cpu)."""
+    import torch
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def _load_gpu_model(device: str):
+    """Load the model on a GPU in bf16 (CUDA with bf16 support) or fp16; returns (model, variant)."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if device == "cuda" and torch.cuda.is_bf16_supported():
+        dtype = torch.bfloat16
+    else:
+        dtype = torch.float16
+
+    logger.info("Embedding model precision", device=device, dtype=str(dtype))
+    model = SentenceTransformer(
+        _EMBED_MODEL,
+        device=device,
+        model_kwargs={"torch_dtype": dtype},
+        tokenizer_kwargs={'clean_up_tokenization_spaces': False},
+    )
+    return model, f"{device}-{str(dtype).removeprefix('torch.')}"
+
+
+def _load_onnx_model():
+    """
+    Load the INT8-quantized ONNX export of the embedding model.
+
+    The export runs once and is saved under _ONNX_CACHE_DIR; later boots
+    load the quantized file directly.
+    """
+    import onnxruntime as ort
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    export_dir = os.path.join(_ONNX_CACHE_DIR, _EMBED_MODEL.replace("/", "__"))
+    file_name = f"onnx/model_qint8_{_ONNX_QUANTIZATION}.onnx"
+
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        logger.info("Exporting INT8 ONNX model", quantization=_ONNX_QUANTIZATION, path=export_dir)
+        fp32_model = SentenceTransformer(_EMBED_MODEL, backend="onnx")
+        fp32_model.save_pretrained(export_dir)
+        export_dynamic_quantized_onnx_model(fp32_model, _ONNX_QUANTIZATION, export_dir)
+
+    session_options = ort.SessionOptions()
+    session_options.intra_op_num_threads = _EMBED_THREADS
+
+    return SentenceTransformer(
+        export_dir,
+        backend="onnx",
+        model_kwargs={"file_name": file_name, "session_options": session_options},
+        tokenizer_kwargs={'clean_up_tokenization_spaces': False},
+    )
+
 
 def preload_model():
     """Preload the embedding model on startup to avoid first-request delay."""
-    global _model
-    if _model is None:
-        from sentence_transformers import SentenceTransformer
-        print(f"Loading embedding model: {_EMBED_MODEL}...")
-        
+    global _model, _model_label
+    with _load_lock:
+        if _model is None:
+            _model, variant = _load_model()
+            _model_label = f"{_EMBED_MODEL}:{variant}"
+            model_ready.set()
+    return _model
+
+
+def _load_model():
+    """
+    Load and warm up the embedding model for the detected device.
+
+    Returns:
+        (model, variant), variant naming the backend and precision loaded
+    """
+    from sentence_transformers import SentenceTransformer
+    logger.info("Loading embedding model", model=_EMBED_MODEL, backend=_EMBED_BACKEND, threads=_EMBED_THREADS)
+
+    device = _detect_device()
+    if device != "cpu":
+        # INT8 ONNX is a CPU path; on a GPU half precision is the faster option
+        model, variant = _load_gpu_model(device)
+    elif _EMBED_BACKEND == "onnx":
+        model = _load_onnx_model()
+        variant = f"onnx-qint8-{_ONNX_QUANTIZATION}"
+    else:
+        import torch
+        torch.set_num_threads(_EMBED_THREADS)
         # Load model with explicit tokenizer settings to avoid FutureWarning
-        _model = SentenceTransformer(
+        model = SentenceTransformer(
             _EMBED_MODEL,
             tokenizer_kwargs={'clean_up_tokenization_spaces': False}
         )
-        
-        # Warm up with a test embedding
-        _model.encode(["test"], normalize_embeddings=True, show_progress_bar=False)
-        print(f"Embedding model loaded: {_EMBED_MODEL}")
-    return _model
+        variant = "torch-float32"
+
+    # Warm up with a test embedding
+    _encode(model, ["test"])
+    logger.info("Embedding model loaded", model=_EMBED_MODEL, variant=variant)
+    return model, variant
 
 def get_model():
-    global _model
     if _model is None:
-        preload_model()
+        # Waits for the startup preload if it is still running
+        return preload_model()
     return _model
 
-def embed_texts(texts: List[str]) -> List[List[float]]:
+
+def embedding_cache_label() -> str:
+    """Label of the loaded encoder for the embedding cache (waits for the model to load)."""
+    get_model()
+    return _model_label
+
+
+def _encode(model, texts: List[str]) -> np.ndarray:
+    """
+    Tokenize every text in one fast-tokenizer call, then run the forward
+    pass over slices of it.
+
+    Texts are sorted by length so each slice is trimmed to its own longest
+    sequence instead of the global one; rows are returned in input order.
+    """
+    import torch
+    import torch.nn.functional as F
+
+    order = np.argsort([-len(t) for t in texts], kind="stable")
+    features = model.tokenize([texts[i] for i in order])
+
+    outputs = []
+    with torch.inference_mode():
+        for start in range(0, len(texts), _EMBED_BATCH_SIZE):
+            batch = {k: v[start:start + _EMBED_BATCH_SIZE] for k, v in features.items()}
+            width = int(batch["attention_mask"].sum(dim=1).max())
+            batch = {k: v[:, :width].to(model.device) for k, v in batch.items()}
+            outputs.append(model(batch)["sentence_embedding"])
+
+    # Normalize in fp32 so half-precision rounding doesn't skew the unit norm
+    vecs = F.normalize(torch.cat(outputs).float(), p=2, dim=1).cpu().numpy()
+    result = np.empty_like(vecs)
+    result[order] = vecs
+    return result
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    Embed texts as L2-normalized vectors.
+
+    Returns a contiguous (len(texts), dim) float32 array; rows bind directly
+    to pgvector columns without a round-trip through Python lists.
+    """
     model = get_model()
-    vecs = model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
-    if isinstance(vecs, np.ndarray):
-        return vecs.tolist()
-    return [v for v in vecs]
\ No newline at end of file
+    if not texts:
+        return np.empty((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    return _encode(model, texts)
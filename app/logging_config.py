@@ -7,6 +7,10 @@ import structlog
 import logging
 import sys
 
+# Level the logger was configured with; lets hot paths skip building
+# expensive debug payloads (the filtering logger only drops the call)
+_level = logging.INFO
+
 
 def setup_logging(log_level: str = "INFO", json_logs: bool = False):
     """
@@ -16,8 +20,10 @@ def setup_logging(log_level: str = "INFO", json_logs: bool = False):
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
         json_logs: If True, output JSON. If False, use pretty console output.
     """
+    global _level
     # Convert string level to logging constant
     numeric_level = getattr(logging, log_level.upper(), logging.INFO)
+    _level = numeric_level
     
     # Configure standard logging
     logging.basicConfig(
@@ -60,6 +66,11 @@ def setup_logging(log_level: str = "INFO", json_logs: bool = False):
     return structlog.get_logger()
 
 
+def is_debug_enabled() -> bool:
+    """Whether debug logs are emitted; guard debug calls with costly arguments."""
+    return _level <= logging.DEBUG
+
+
 # Create logger instance
 # Set json_logs=True for production, False for development
 logger = setup_logging(log_level="INFO", json_logs=False)
\ No newline at end of file
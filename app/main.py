@@ -2,15 +2,22 @@
 Main FastAPI application entry point.
 Responsibilities: App setup, router registration, startup/shutdown hooks.
 """
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
-from .routes import chat, models
+from .routes import chat, health, models
 from .documents import router as docs_router
 from .upload import router as upload_router
 from .db.migrations import run_sql_migrations
 from .ollama_boot import ensure_ollama_models
+from .ollama_client import close_session as close_ollama_session
+from .openai_client import client as openai_client
 from .embedding import preload_model
+from .services.document_service import fail_interrupted_documents
+from .services.embedding_service import embedding_batcher
+from .state import refresh_has_documents
 from .logging_config import logger
 
 # -------------------------------------------------
@@ -24,6 +31,17 @@ app.include_router(chat.router)
 app.include_router(upload_router)
 app.include_router(docs_router)
 app.include_router(models.router)
+app.include_router(health.router)
+
+
+def _log_preload_result(task: asyncio.Task):
+    """Surface the outcome of the background embedding-model load."""
+    if task.cancelled():
+        return
+    if task.exception():
+        logger.error("Embedding model preload failed", exc_info=task.exception())
+    else:
+        logger.info("Embedding model ready")
 
 
 @app.on_event("startup")
@@ -33,10 +51,16 @@ async def startup_event():
         logger.info("Running database migrations...")
         run_sql_migrations()
         logger.info("Database migrations completed")
+        refresh_has_documents()
+        interrupted = fail_interrupted_documents()
+        if interrupted:
+            logger.warning("Marked interrupted uploads as failed", count=interrupted)
 
-        logger.info("Preloading embedding model...")
-        preload_model()
-        logger.info("Embedding model ready")
+        # Load the embedding model in a worker thread so the event loop stays
+        # free for requests (/api/health) and the Ollama check below.
+        logger.info("Preloading embedding model in background...")
+        app.state.embedding_preload = asyncio.create_task(asyncio.to_thread(preload_model))
+        app.state.embedding_preload.add_done_callback(_log_preload_result)
         
         logger.info("Ensuring Ollama models are available...")
         await ensure_ollama_models()
@@ -51,6 +75,10 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Application shutting down")
+    await close_ollama_session()
+    # Release the AsyncOpenAI client's pooled HTTP connections
+    await openai_client.close()
+    await embedding_batcher.close()
 
 
 # Static files last (so they don't swallow /api/* routes)
@@ -1,21 +1,35 @@
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, BigInteger, TIMESTAMP, text
+from sqlalchemy import Column, Text, Integer, ForeignKey, BigInteger, TIMESTAMP, Index, text
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 
 Base = declarative_base()
 
+# Mirrors the schema built by app/db/scripts; the migrations are authoritative
+
 class Document(Base):
     __tablename__ = "documents"
-    id = Column(String, primary_key=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     filename = Column(Text, nullable=False)
     mime_type = Column(Text)
     size_bytes = Column(BigInteger)
     uploaded_at = Column(TIMESTAMP(timezone=True), server_default=text("NOW()"))
+    num_chunks = Column(Integer, nullable=False, server_default=text("0"))
+    # 'processing' until the chunks are indexed, then 'ready' or 'failed'
+    status = Column(Text, nullable=False, server_default=text("'ready'"))
+
+    __table_args__ = (
+        Index("idx_documents_uploaded_at", uploaded_at.desc()),
+    )
 
 class Chunk(Base):
     __tablename__ = "chunks"
-    id = Column(String, primary_key=True)
-    document_id = Column(String, ForeignKey("documents.id", ondelete="CASCADE"))
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"))
     chunk_index = Column(Integer, nullable=False)
     content = Column(Text, nullable=False)
-    embedding = Column(Vector(384), nullable=False)
+    embedding = Column(HALFVEC(384), nullable=False)
+
+    __table_args__ = (
+        Index("idx_chunks_doc", document_id),
+    )
@@ -1,22 +1,69 @@
+from typing import Optional
+
 import aiohttp
-import json
+import orjson
 
 OLLAMA_URL = "http://ollama:11434"
 
+# Shared across boot checks and chat requests so keep-alive connections are reused
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the process-wide Ollama HTTP session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        _SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=300)
+        )
+    return _SESSION
+
+
+async def close_session():
+    """Close the shared session (called on application shutdown)."""
+    global _SESSION
+    if _SESSION is not None and not _SESSION.closed:
+        await _SESSION.close()
+    _SESSION = None
+
+
 async def stream_ollama_chat(model: str, messages: list):
     """
     Stream chat completion tokens from Ollama.
     Yields: {"type":"delta", "text": "..."}
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            f"{OLLAMA_URL}/api/chat",
-            json={"model": model, "messages": messages, "stream": True, "keep_alive": "10m"},
-        ) as resp:
-            async for line in resp.content:
-                try:
-                    data = json.loads(line.decode().strip())
-                    if "message" in data and "content" in data["message"]:
-                        yield {"type": "delta", "text": data["message"]["content"]}
-                except Exception:
-                    continue
+    session = await get_session()
+    async with session.post(
+        f"{OLLAMA_URL}/api/chat",
+        json={"model": model, "messages": messages, "stream": True, "keep_alive": "10m"},
+    ) as resp:
+        # Ollama streams NDJSON; network chunks don't align with lines,
+        # so split on b"\n" ourselves and parse the raw bytes.
+        buf = bytearray()
+        async for raw in resp.content.iter_chunked(4096):
+            buf += raw
+            *lines, rest = buf.split(b"\n")
+            buf = bytearray(rest)
+            for line in lines:
+                event = _parse_line(line)
+                if event is not None:
+                    yield event
+        event = _parse_line(buf)
+        if event is not None:
+            yield event
+
+
+def _parse_line(line: bytes):
+    """Decode one NDJSON line into a delta event, or None if it carries no text."""
+    if not line.strip():
+        return None
+    try:
+        data = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None
+    # The final done frame and some tool/thinking frames carry "" content;
+    # an empty delta would otherwise reach the client as its own SSE frame
+    content = (data.get("message") or {}).get("content")
+    if not content:
+        return None
+    return {"type": "delta", "text": content}
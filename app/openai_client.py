@@ -7,7 +7,8 @@ _OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not _OPENAI_API_KEY:
     raise RuntimeError("OPENAI_API_KEY is not set. Put it in env or .env (server-side only).")
 
-from openai import OpenAI
-client = OpenAI(api_key=_OPENAI_API_KEY)
+from openai import AsyncOpenAI
+# Async client so streaming reads never block the event loop
+client = AsyncOpenAI(api_key=_OPENAI_API_KEY)
 
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
@@ -1,40 +1,108 @@
-from typing import List, Dict
-from sqlalchemy import text as sa_text
+import os
+from functools import lru_cache
+from typing import List, Dict, Tuple
+import numpy as np
+from sqlalchemy import bindparam, text as sa_text
+from pgvector.sqlalchemy import Vector
 from .db import engine
 from time import perf_counter
 from .embedding import embed_texts
 from .logging_config import logger
+from .state import corpus_version
 
-def search_similar(query: str, top_k: int = 5) -> List[Dict]:
+# Chunks shortlisted by binary (Hamming) distance before the exact rerank
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "200"))
+# HNSW candidate list size: higher = better recall, slower search.
+# An HNSW scan returns at most ef_search rows, so set it to at least
+# RERANK_CANDIDATES (the default); a smaller value shrinks the shortlist.
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", str(RERANK_CANDIDATES)))
+if HNSW_EF_SEARCH < RERANK_CANDIDATES:
+    logger.warning(
+        "HNSW_EF_SEARCH is below RERANK_CANDIDATES; the shortlist is capped at ef_search rows",
+        ef_search=HNSW_EF_SEARCH,
+        rerank_candidates=RERANK_CANDIDATES,
+    )
+# Recent (question, top_k) search results kept in memory
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+
+# Statements are built once at import instead of on every search
+_SET_EF_SEARCH_SQL = sa_text(f"SET LOCAL hnsw.ef_search = {HNSW_EF_SEARCH}")
+# Stage 1 walks the bit(384) HNSW index by Hamming distance (<~>);
+# stage 2 reranks that shortlist by exact cosine distance on the halfvec.
+# Content is cut to the 800 characters the prompt uses before it leaves
+# the database.
+_SEARCH_SQL = sa_text("""
+    SELECT
+        c.id,
+        c.document_id,
+        d.filename,
+        c.chunk_index,
+        left(c.content, 800) AS content,
+        1 - (c.embedding <=> (:qv)::halfvec(384)) AS score
+    FROM (
+        SELECT id, document_id, chunk_index, content, embedding
+        FROM chunks
+        ORDER BY binary_quantize(embedding)::bit(384)
+                 <~> binary_quantize((:qv)::halfvec(384))
+        LIMIT :candidates
+    ) c
+    JOIN documents d ON d.id = c.document_id
+    ORDER BY c.embedding <=> (:qv)::halfvec(384)
+    LIMIT :k
+""").bindparams(bindparam("qv", type_=Vector(384)))
+
+
+@lru_cache(maxsize=1024)
+def embed_query(query: str) -> np.ndarray:
+    """Embed a single query, memoized so repeated questions skip the encoder."""
+    vec = embed_texts([query])[0]
+    vec.setflags(write=False)  # shared between callers via the cache
+    return vec
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so trivially different questions share cache entries."""
+    return " ".join(query.split()).lower()
+
+
+def search_similar(query: str, top_k: int = 5) -> Tuple[List[Dict], np.ndarray]:
     """
         Search for similar chunks in the database.
 
+        Results are memoized per (normalized query, top_k, corpus version), so
+        a repeated question skips both the encoder and the index scan, and an
+        upload or delete makes older entries unreachable.
+
         Parameters:
         query (str): The query string to search for.
         top_k (int): The number of top similar chunks to return. Defaults to 5.
 
         Returns:
-        List[Dict]: A list of dictionaries containing the similar chunks.
+        Tuple[List[Dict], np.ndarray]: The similar chunks (best first, content
+        truncated to 800 characters) and their scores as a read-only float64
+        array, aligned with the list. The chunk dicts are shared with the
+        cache and must not be modified.
     """
-    qv = embed_texts([query])[0]
+    chunks, scores = _cached_search(normalize_query(query), top_k, corpus_version())
+    return list(chunks), scores
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _cached_search(query: str, top_k: int, version: int) -> Tuple[Tuple[Dict, ...], np.ndarray]:
+    """Run the two-stage search; version only takes part in the cache key."""
+    qv = embed_query(query)
     t = perf_counter()
     
     with engine.begin() as conn:
+        conn.execute(_SET_EF_SEARCH_SQL)
         rows = conn.execute(
-            sa_text("""
-                SELECT
-                    c.id,
-                    c.document_id,
-                    d.filename,
-                    c.chunk_index,
-                    c.content,
-                    1 - (c.embedding <=> (:qv)::vector) AS score
-                FROM chunks c
-                JOIN documents d ON d.id = c.document_id
-                ORDER BY c.embedding <-> (:qv)::vector
-                LIMIT :k
-            """),
-            {"qv": qv, "k": top_k},
+            _SEARCH_SQL,
+            {"qv": qv, "k": top_k, "candidates": max(RERANK_CANDIDATES, top_k)},
         ).mappings().all()
     logger.info('''Search for similar chunks in %.2f ms''', (perf_counter() - t) * 1000)
-    return [dict(r) for r in rows]
+    # score is double precision (pgvector's <=>), so it arrives as a Python
+    # float; nothing downstream needs to convert it again
+    chunks = tuple(dict(r) for r in rows)
+    scores = np.fromiter((c["score"] for c in chunks), dtype=np.float64, count=len(chunks))
+    scores.setflags(write=False)  # shared between callers via the cache
+    return chunks, scores
@@ -2,10 +2,11 @@
 Chat-related API routes.
 Handles conversation management and RAG question answering.
 """
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
+import msgspec
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 
-from ..schemas import AskBody
+from ..schemas import ask_body_decoder
 from ..services.conversation_service import (
     get_conversation_by_id,
     delete_conversation_by_id
@@ -24,7 +25,9 @@ async def get_conversation(conversation_id: int):
     """
     try:
         conversation_data = get_conversation_by_id(conversation_id)
-        return JSONResponse(conversation_data)
+        # orjson end to end: sources are decoded by orjson in the driver,
+        # and the response body is encoded with it too
+        return ORJSONResponse(conversation_data)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -43,11 +46,14 @@ async def delete_conversation(conversation_id: int):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/ask_stream")
-async def ask_rag_stream(payload: AskBody):
+@router.post("/ask_stream", response_class=StreamingResponse)
+async def ask_rag_stream(request: Request):
     """
     Streaming RAG endpoint using Server-Sent Events (SSE).
     
+    The body is decoded with msgspec (see schemas.AskBody) rather than
+    FastAPI's Pydantic validation; invalid bodies get a 422.
+    
     Workflow:
     1. Resolve model/provider
     2. Create/retrieve conversation
@@ -56,6 +62,13 @@ async def ask_rag_stream(payload: AskBody):
     5. Build context and stream LLM response
     6. Store assistant message
     """
+    try:
+        payload = ask_body_decoder.decode(await request.body())
+    except msgspec.ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except msgspec.DecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
     try:
         # handle_rag_query returns an async generator, don't await it
         return StreamingResponse(
@@ -0,0 +1,23 @@
+"""
+Health check API routes.
+Used by readiness probes; responds while startup work is still running.
+"""
+from fastapi import APIRouter
+
+from ..embedding import model_ready
+
+router = APIRouter(prefix="/api", tags=["health"])
+
+
+@router.get("/health")
+async def health():
+    """
+    Report liveness and whether the embedding model has finished loading.
+    
+    Example response:
+    {
+        "status": "ok",
+        "embedding_ready": true
+    }
+    """
+    return {"status": "ok", "embedding_ready": model_ready.is_set()}
@@ -1,29 +1,47 @@
 """
-Pydantic schemas for request/response validation.
+msgspec schemas for request/response validation.
+
+Request bodies are decoded and validated in one pass by msgspec, which is
+much cheaper per request than building Pydantic models.
 """
-from typing import List, Literal, Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal, Optional
+
+import msgspec
 
 Role = Literal["system", "user", "assistant"]
 
 
-class ChatTurn(BaseModel):
+class ChatTurn(msgspec.Struct, frozen=True):
     """Represents a single turn in a conversation."""
     role: Role
     content: str
 
 
-class AskBody(BaseModel):
+class AskBody(msgspec.Struct, frozen=True):
     """Request body for asking questions."""
-    question: str = Field(..., min_length=1, description="The question to ask")
-    history: Optional[List[ChatTurn]] = Field(None, description="Previous conversation turns")
-    top_k: int = Field(5, ge=1, le=20, description="Number of chunks to retrieve")
-    min_score: float = Field(0.15, ge=0.0, le=1.0, description="Minimum similarity score")
-    model: Optional[str] = Field(None, description="Model identifier: 'openai:gpt-4o-mini' or 'ollama:qwen2.5:7b'")
-    chat_id: Optional[int] = Field(None, description="Existing conversation ID or None for new conversation")
+    question: Annotated[str, msgspec.Meta(min_length=1, description="The question to ask")]
+    history: Annotated[
+        Optional[List[ChatTurn]], msgspec.Meta(description="Previous conversation turns")
+    ] = None
+    top_k: Annotated[int, msgspec.Meta(ge=1, le=20, description="Number of chunks to retrieve")] = 5
+    min_score: Annotated[
+        float, msgspec.Meta(ge=0.0, le=1.0, description="Minimum similarity score")
+    ] = 0.15
+    model: Annotated[
+        Optional[str],
+        msgspec.Meta(description="Model identifier: 'openai:gpt-4o-mini' or 'ollama:qwen2.5:7b'"),
+    ] = None
+    chat_id: Annotated[
+        Optional[int],
+        msgspec.Meta(description="Existing conversation ID or None for new conversation"),
+    ] = None
 
 
-class Source(BaseModel):
+class Source(msgspec.Struct):
     """Represents a source document used in RAG."""
     filename: str
     score: float
+
+
+# Reusable decoder: validates types and constraints while parsing the JSON
+ask_body_decoder = msgspec.json.Decoder(AskBody)
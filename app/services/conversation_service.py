@@ -2,23 +2,44 @@
 Conversation management service.
 Handles CRUD operations for conversations and messages.
 """
-import json
 from typing import Dict, List, Any
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
 from ..db import engine
 from ..logging_config import logger
 
+# sources is bound as JSONB so the engine's orjson serializer encodes it;
+# None stays SQL NULL rather than JSON 'null'
+_INSERT_MESSAGE_SQL = text("""
+    INSERT INTO conversation_messages 
+    (conversation_id, role, content, model_provider, model_name, sources)
+    VALUES (:cid, :role, :content, :provider, :model, :sources)
+    RETURNING created_at
+""").bindparams(bindparam("sources", type_=JSONB(none_as_null=True)))
 
-def create_conversation() -> int:
+
+def create_conversation_with_first_message(role: str, content: str) -> int:
     """
-    Create a new conversation.
+    Create a conversation and store its first message in one statement.
     
+    Args:
+        role: "user" or "assistant"
+        content: The message content
+        
     Returns:
         int: The ID of the newly created conversation
     """
     with engine.begin() as conn:
         result = conn.execute(
-            text("INSERT INTO conversations DEFAULT VALUES RETURNING id")
+            text("""
+                WITH new_conv AS (
+                    INSERT INTO conversations DEFAULT VALUES RETURNING id
+                )
+                INSERT INTO conversation_messages (conversation_id, role, content)
+                SELECT id, :role, :content FROM new_conv
+                RETURNING conversation_id
+            """),
+            {"role": role, "content": content},
         )
         conversation_id = result.scalar_one()
         logger.info("Created new conversation", conversation_id=conversation_id)
@@ -47,23 +68,16 @@ def store_message(
     Returns:
         The created_at timestamp of the message
     """
-    sources_json = json.dumps(sources) if sources is not None else None
-    
     with engine.begin() as conn:
         result = conn.execute(
-            text("""
-                INSERT INTO conversation_messages 
-                (conversation_id, role, content, model_provider, model_name, sources)
-                VALUES (:cid, :role, :content, :provider, :model, :sources)
-                RETURNING created_at
-            """),
+            _INSERT_MESSAGE_SQL,
             {
                 "cid": conversation_id,
                 "role": role,
                 "content": content,
                 "provider": model_provider,
                 "model": model_name,
-                "sources": sources_json,
+                "sources": sources,
             },
         )
         timestamp = result.scalar_one()
@@ -97,41 +111,38 @@ def get_conversation_by_id(conversation_id: int) -> Dict[str, Any]:
         # Get all messages
         messages = conn.execute(
             text("""
-                SELECT id, role, content, created_at, model_provider, model_name, sources
-                FROM conversation_messages
-                WHERE conversation_id = :cid
-                ORDER BY created_at ASC
+                SELECT m.id,
+                       m.role,
+                       m.content,
+                       m.created_at,
+                       m.model_provider,
+                       m.model_name,
+                       NULLIF(m.sources, '[]'::jsonb) AS sources
+                FROM conversation_messages m
+                WHERE m.conversation_id = :cid
+                ORDER BY m.created_at ASC
             """),
             {"cid": conversation_id}
-        ).mappings().all()
-    
-    # Serialize messages
-    serializable_messages = []
-    for msg in messages:
-        msg_dict = dict(msg)
-        
-        # Convert datetime to ISO format
-        if msg_dict.get('created_at'):
-            msg_dict['created_at'] = msg_dict['created_at'].isoformat()
-        
-        # Parse sources JSON
-        if msg_dict.get('sources'):
-            try:
-                msg_dict['sources'] = (
-                    json.loads(msg_dict['sources']) 
-                    if isinstance(msg_dict['sources'], str) 
-                    else msg_dict['sources']
-                )
-            except (json.JSONDecodeError, TypeError):
-                msg_dict['sources'] = []
-        else:
-            msg_dict['sources'] = None
-            
-        serializable_messages.append(msg_dict)
+        ).all()
     
+    # Rows are already serializable: ORJSONResponse encodes created_at the
+    # same way as the stream's timestamps, and sources is decoded from JSONB
+    # by the driver (empty lists come back as NULL).
+    # Plain tuples unpacked into dict literals: no RowMapping or dict() copy.
     return {
         "conversation_id": conversation_id,
-        "messages": serializable_messages
+        "messages": [
+            {
+                "id": msg_id,
+                "role": role,
+                "content": content,
+                "created_at": created_at,
+                "model_provider": model_provider,
+                "model_name": model_name,
+                "sources": sources,
+            }
+            for msg_id, role, content, created_at, model_provider, model_name, sources in messages
+        ]
     }
 
 
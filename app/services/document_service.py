@@ -0,0 +1,396 @@
+"""
+Document ingestion service.
+Handles text extraction, chunking, embedding and storage of uploaded files.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+from fastapi import UploadFile
+from sqlalchemy import column, insert, table, text
+
+from ..db import SessionLocal
+from ..db.bulk import copy_chunks, copy_embedding_cache, decode_halfvec
+from ..embedding import embedding_cache_label
+from ..text_extraction import file_kind, iter_any, simple_chunks
+from ..services.embedding_service import EMBED_MAX_BATCH, embedding_batcher
+from ..utils.helpers import uuid7_batch
+from ..logging_config import logger
+
+# Chunk lists of recently parsed files, keyed by a digest of the file bytes
+# and the parser used, so re-uploading a file skips PDF/DOCX parsing.
+# Bounded by entry count and by the total characters of cached chunks.
+EXTRACT_CACHE_SIZE = int(os.getenv("EXTRACT_CACHE_SIZE", "32"))
+EXTRACT_CACHE_MAX_CHARS = int(os.getenv("EXTRACT_CACHE_MAX_CHARS", str(32 * 1024 * 1024)))
+
+# Core table construct so all document rows go in one
+# INSERT ... VALUES (...), (...) via insertmanyvalues
+_documents_table = table(
+    "documents",
+    column("id"),
+    column("filename"),
+    column("mime_type"),
+    column("size_bytes"),
+    column("num_chunks"),
+    column("status"),
+)
+
+# documents.status: chunks are embedded after the upload response is sent
+STATUS_PROCESSING = "processing"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+_SET_STATUS_SQL = text("UPDATE documents SET status = :status WHERE id = ANY(CAST(:ids AS uuid[]))")
+# num_chunks is only set once the chunks are actually stored
+_SET_READY_SQL = text("""
+    UPDATE documents d
+    SET status = :status, num_chunks = v.num_chunks
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:counts AS int[])) AS v(id, num_chunks)
+    WHERE d.id = v.id
+""")
+_FAIL_INTERRUPTED_SQL = text("""
+    UPDATE documents SET status = :failed WHERE status = :processing
+""")
+
+# Vectors come back in pgvector's binary send format (packed fp16) rather
+# than '[0.1,0.2,...]' text
+_CACHED_EMBEDDINGS_SQL = text("""
+    SELECT hash, halfvec_send(embedding)
+    FROM embedding_cache
+    WHERE model = :model AND hash = ANY(:hashes)
+""")
+
+
+def chunk_hash(chunk: str) -> bytes:
+    """
+    Content hash identifying a chunk text in the embedding cache.
+    
+    BLAKE2b from the standard library at 128 bits: collisions are negligible
+    at corpus scale and the shorter key keeps the primary-key index small.
+    """
+    return hashlib.blake2b(chunk.encode("utf-8"), digest_size=16).digest()
+
+
+def lookup_cached_embeddings(hashes: List[bytes]) -> Dict[bytes, np.ndarray]:
+    """
+    Fetch cached embeddings for chunk hashes in one query.
+    
+    Args:
+        hashes: Content hashes (see chunk_hash)
+        
+    Returns:
+        Mapping of hash to float32 embedding for the hashes found
+    """
+    with SessionLocal() as db:
+        rows = db.execute(
+            _CACHED_EMBEDDINGS_SQL, {"model": embedding_cache_label(), "hashes": hashes}
+        ).all()
+    return {bytes(digest): decode_halfvec(value) for digest, value in rows}
+
+# Value: (chunks, total characters of the chunks)
+_EXTRACT_CACHE: "OrderedDict[bytes, Tuple[List[str], int]]" = OrderedDict()
+_extract_cache_chars = 0
+# Files are extracted concurrently in worker threads
+_extract_cache_lock = threading.Lock()
+
+
+def _file_key(f: UploadFile) -> bytes:
+    """Digest of the file bytes and the parser they go through; leaves the file rewound."""
+    digest = hashlib.file_digest(f.file, lambda: hashlib.blake2b(digest_size=16))
+    f.file.seek(0)
+    digest.update(file_kind(f.content_type or "", f.filename or "").encode("utf-8"))
+    return digest.digest()
+
+
+def _cache_chunks(key: bytes, parts: List[str]) -> None:
+    """Cache a file's chunks, evicting least recently used files past either limit."""
+    global _extract_cache_chars
+    size = sum(len(p) for p in parts)
+    if size > EXTRACT_CACHE_MAX_CHARS:
+        return
+    with _extract_cache_lock:
+        previous = _EXTRACT_CACHE.pop(key, None)
+        if previous is not None:
+            _extract_cache_chars -= previous[1]
+        _EXTRACT_CACHE[key] = (parts, size)
+        _extract_cache_chars += size
+        while len(_EXTRACT_CACHE) > EXTRACT_CACHE_SIZE or _extract_cache_chars > EXTRACT_CACHE_MAX_CHARS:
+            _, (_, evicted) = _EXTRACT_CACHE.popitem(last=False)
+            _extract_cache_chars -= evicted
+
+
+def extract_chunks(f: UploadFile) -> List[str]:
+    """
+    Extract a file's text and split it into chunks.
+    
+    PDFs are chunked page by page as they are parsed, so the full document
+    text is never built. A file whose bytes were parsed recently reuses the
+    cached chunks.
+    
+    Args:
+        f: The uploaded file; read straight from its spooled file object
+        
+    Returns:
+        The text chunks, or an empty list if the file has no extractable text
+    """
+    key = _file_key(f)
+    with _extract_cache_lock:
+        cached = _EXTRACT_CACHE.get(key)
+        if cached is not None:
+            _EXTRACT_CACHE.move_to_end(key)
+            return cached[0]
+
+    parts = list(simple_chunks(iter_any(f.file, f.content_type or "", f.filename)))
+    if not any(part.strip() for part in parts):
+        parts = []
+
+    _cache_chunks(key, parts)
+    return parts
+
+
+def insert_documents(docs: List[Tuple[UploadFile, List[str]]]) -> Tuple[List[uuid.UUID], List[Dict]]:
+    """
+    Insert the document rows of an upload with status 'processing'.
+    
+    All rows go in one multi-row INSERT; chunks follow in index_documents,
+    which also sets num_chunks.
+    
+    Args:
+        docs: (file, chunks) pairs
+        
+    Returns:
+        The document ids, and one {document_id, filename, chunks, status}
+        entry per document
+    """
+    doc_uuids = uuid7_batch(len(docs))
+    doc_ids = [str(u) for u in doc_uuids]
+    doc_rows = [
+        {
+            "id": doc_id,
+            "filename": f.filename,
+            "mime_type": f.content_type or "",
+            "size_bytes": getattr(f, "size", 0) or 0,
+            "num_chunks": 0,
+            "status": STATUS_PROCESSING,
+        }
+        for doc_id, (f, parts) in zip(doc_ids, docs)
+    ]
+
+    with SessionLocal() as db, db.begin():
+        db.execute(insert(_documents_table), doc_rows)
+
+    return doc_uuids, [
+        {"document_id": doc_id, "filename": f.filename, "chunks": len(parts), "status": STATUS_PROCESSING}
+        for doc_id, (f, parts) in zip(doc_ids, docs)
+    ]
+
+
+def store_chunks(
+    doc_uuids: List[uuid.UUID],
+    parts_per_doc: List[List[str]],
+    vecs: np.ndarray,
+    new_cache_entries: List[Tuple[bytes, np.ndarray]],
+) -> List[uuid.UUID]:
+    """
+    Insert the chunks of inserted documents and mark them ready.
+    
+    Each document's chunks go in one binary COPY inside its own SAVEPOINT,
+    so a document that fails (e.g. deleted while it was being indexed) is
+    rolled back and marked 'failed' without discarding the others. Freshly
+    computed embeddings are written back to the embedding cache in the same
+    transaction, best effort.
+    
+    Args:
+        doc_uuids: Document ids from insert_documents
+        parts_per_doc: Chunk texts of each document, aligned with doc_uuids
+        vecs: Embeddings for every chunk of every document, in the same order
+        new_cache_entries: (content hash, embedding) pairs missing from the cache
+        
+    Returns:
+        Ids of the documents that were stored
+    """
+    chunk_ids = iter(uuid7_batch(len(vecs)))
+
+    # Cast the whole matrix to the wire format (big-endian fp16) in one pass
+    # instead of converting every row while the COPY buffer is written
+    wire_vecs = np.asarray(vecs, dtype=">f2")
+
+    stored, stored_counts, failed = [], [], []
+    with SessionLocal() as db, db.begin():
+        offset = 0
+        for doc_uuid, parts in zip(doc_uuids, parts_per_doc):
+            doc_vecs = wire_vecs[offset:offset + len(parts)]
+            offset += len(parts)
+            try:
+                with db.begin_nested():
+                    # Binary COPY: one round-trip, embeddings sent as packed floats
+                    copy_chunks(db.connection(), (
+                        (next(chunk_ids), doc_uuid, i, chunk, vec)
+                        for i, (chunk, vec) in enumerate(zip(parts, doc_vecs))
+                    ))
+                stored.append(doc_uuid)
+                stored_counts.append(len(parts))
+            except Exception as e:
+                logger.error("Storing document chunks failed", document_id=str(doc_uuid), error=str(e))
+                failed.append(doc_uuid)
+
+        if new_cache_entries:
+            try:
+                with db.begin_nested():
+                    copy_embedding_cache(db.connection(), embedding_cache_label(), new_cache_entries)
+            except Exception as e:
+                logger.warning("Writing embedding cache failed", entries=len(new_cache_entries), error=str(e))
+
+        if stored:
+            db.execute(_SET_READY_SQL, {
+                "status": STATUS_READY,
+                "ids": [str(u) for u in stored],
+                "counts": stored_counts,
+            })
+        if failed:
+            db.execute(_SET_STATUS_SQL, {"status": STATUS_FAILED, "ids": [str(u) for u in failed]})
+
+    return stored
+
+
+def fail_interrupted_documents() -> int:
+    """
+    Mark documents left 'processing' by a previous run as 'failed'.
+    
+    Indexing runs as a background task of the upload request, so a restart
+    mid-index leaves rows that nothing will finish. Called at startup.
+    
+    Returns:
+        Number of documents marked failed
+    """
+    with SessionLocal() as db, db.begin():
+        result = db.execute(
+            _FAIL_INTERRUPTED_SQL, {"failed": STATUS_FAILED, "processing": STATUS_PROCESSING}
+        )
+    return result.rowcount
+
+
+def mark_documents_failed(doc_uuids: List[uuid.UUID]) -> None:
+    """Flag documents whose chunks could not be indexed."""
+    with SessionLocal() as db, db.begin():
+        db.execute(_SET_STATUS_SQL, {"status": STATUS_FAILED, "ids": [str(u) for u in doc_uuids]})
+
+
+async def embed_batches(parts: List[str]) -> np.ndarray:
+    """
+    Embed chunks through the shared dynamic batcher in bounded sub-batches.
+    
+    Caps the size of any single encoder call for very large uploads; small
+    uploads running at the same time share encoder calls. Chunks are
+    length-sorted across the whole upload before slicing, so each sub-batch
+    holds similar lengths and pads little (embed_texts only sorts within
+    one call).
+    
+    Args:
+        parts: Chunk texts
+        
+    Returns:
+        (len(parts), dim) float32 array, rows in input order
+    """
+    if len(parts) <= EMBED_MAX_BATCH:
+        return await embedding_batcher.submit(parts)
+
+    order = np.argsort([-len(p) for p in parts], kind="stable")
+    ordered = [parts[i] for i in order]
+    results = await asyncio.gather(*(
+        embedding_batcher.submit(ordered[i:i + EMBED_MAX_BATCH])
+        for i in range(0, len(ordered), EMBED_MAX_BATCH)
+    ))
+    vecs = np.empty((len(parts), results[0].shape[1]), dtype=results[0].dtype)
+    vecs[order] = np.concatenate(results)
+    return vecs
+
+
+def _hash_and_lookup(parts: List[str]) -> Tuple[List[bytes], Dict[bytes, np.ndarray]]:
+    """Hash every chunk and fetch the cached embeddings (run in a worker thread)."""
+    hashes = [chunk_hash(p) for p in parts]
+    return hashes, lookup_cached_embeddings(hashes)
+
+
+async def embed_with_cache(parts: List[str]) -> Tuple[np.ndarray, List[Tuple[bytes, np.ndarray]]]:
+    """
+    Embed chunks, reusing cached vectors for chunk texts seen before.
+    
+    Chunks are hashed and looked up in one query; only distinct misses go
+    through the encoder.
+    
+    Args:
+        parts: Chunk texts
+        
+    Returns:
+        (len(parts), dim) float32 array in input order, and the
+        (hash, embedding) pairs that were computed and should be cached
+    """
+    hashes, cached = await asyncio.to_thread(_hash_and_lookup, parts)
+
+    # First occurrence of each uncached text; duplicates are embedded once
+    missing: Dict[bytes, str] = {}
+    for digest, part in zip(hashes, parts):
+        if digest not in cached and digest not in missing:
+            missing[digest] = part
+
+    fresh = {}
+    if missing:
+        fresh_vecs = await embed_batches(list(missing.values()))
+        fresh = dict(zip(missing, fresh_vecs))
+
+    logger.info("Embedding cache lookup", chunks=len(parts), hits=len(parts) - len(missing))
+    vecs = np.stack([cached[d] if d in cached else fresh[d] for d in hashes])
+    return vecs, list(fresh.items())
+
+
+async def extract_files(files: List[UploadFile]) -> List[Tuple[UploadFile, List[str]]]:
+    """
+    Parse and chunk uploaded files concurrently in worker threads.
+    
+    Args:
+        files: The uploaded files
+        
+    Returns:
+        (file, chunks) pairs; files without extractable text are skipped
+    """
+    parts_per_file = await asyncio.gather(
+        *(asyncio.to_thread(extract_chunks, f) for f in files)
+    )
+    return [(f, parts) for f, parts in zip(files, parts_per_file) if parts]
+
+
+async def index_documents(doc_uuids: List[uuid.UUID], parts_per_doc: List[List[str]]) -> bool:
+    """
+    Embed and store the chunks of documents inserted by insert_documents.
+    
+    Runs after the upload response has been sent. The chunks of all
+    documents are embedded together (see embed_with_cache) and stored in
+    one transaction with a savepoint per document (see store_chunks);
+    documents that cannot be indexed are marked 'failed'.
+    
+    Args:
+        doc_uuids: Document ids from insert_documents
+        parts_per_doc: Chunk texts of each document, aligned with doc_uuids
+        
+    Returns:
+        True if any of the documents became searchable
+    """
+    all_parts = [chunk for parts in parts_per_doc for chunk in parts]
+    try:
+        all_vecs, new_cache_entries = await embed_with_cache(all_parts)
+        stored = await asyncio.to_thread(
+            store_chunks, doc_uuids, parts_per_doc, all_vecs, new_cache_entries
+        )
+    except Exception as e:
+        logger.error("Indexing documents failed", count=len(doc_uuids), error=str(e))
+        await asyncio.to_thread(mark_documents_failed, doc_uuids)
+        return False
+
+    logger.info("Ingested documents", count=len(stored), failed=len(doc_uuids) - len(stored), chunks=len(all_parts))
+    return bool(stored)
@@ -0,0 +1,126 @@
+"""
+Embedding service.
+Coalesces concurrent embedding requests into shared encoder calls.
+"""
+import asyncio
+import os
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from ..embedding import embed_texts
+from ..logging_config import logger
+
+# Most texts per encoder call, how long a batch waits for more requests, and
+# how many encoder calls may run at once (torch / ONNX Runtime release the GIL)
+EMBED_MAX_BATCH = int(os.getenv("EMBED_UPLOAD_BATCH", "256"))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "8"))
+EMBED_WORKERS = int(os.getenv("EMBED_UPLOAD_CONCURRENCY", "2"))
+
+_Request = Tuple[List[str], asyncio.Future]
+
+
+class DynamicBatcher:
+    """
+    Dynamic batching in front of a blocking embed function.
+
+    Callers submit lists of texts; worker coroutines collect requests for up
+    to max_wait seconds (or until max_batch texts are queued), run one embed
+    call in a worker thread, and hand each caller its slice of the result.
+    Concurrent small uploads then share one forward pass instead of each
+    running a nearly empty batch.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], np.ndarray],
+        max_batch: int,
+        max_wait: float,
+        workers: int,
+    ):
+        self._embed = embed
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._num_workers = workers
+        # Created on first use so they bind to the running event loop
+        self._queue: Optional["asyncio.Queue[_Request]"] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def submit(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as part of the next batch.
+
+        Args:
+            texts: Texts to embed; lists longer than max_batch run on their own
+
+        Returns:
+            (len(texts), dim) float32 array, rows in input order
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self._num_workers)]
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((texts, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop the workers (called on application shutdown)."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def _worker(self) -> None:
+        """Collect requests into batches and run them until cancelled."""
+        loop = asyncio.get_running_loop()
+        carry: Optional[_Request] = None
+        while True:
+            first = carry or await self._queue.get()
+            carry = None
+            batch = [first]
+            size = len(first[0])
+            deadline = loop.time() + self._max_wait
+            while size < self._max_batch:
+                left = deadline - loop.time()
+                if left <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), left)
+                except asyncio.TimeoutError:
+                    break
+                if size + len(request[0]) > self._max_batch:
+                    # Would overflow this batch; it starts the next one
+                    carry = request
+                    break
+                batch.append(request)
+                size += len(request[0])
+            await self._run(batch)
+
+    async def _run(self, batch: List[_Request]) -> None:
+        """Embed one batch and resolve every request in it."""
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        try:
+            vecs = await asyncio.to_thread(self._embed, texts)
+        except Exception as e:
+            logger.error("Embedding batch failed", requests=len(batch), texts=len(texts), error=str(e))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for request_texts, future in batch:
+            end = offset + len(request_texts)
+            # A caller that gave up (cancelled) has a done future; skip it
+            if not future.done():
+                future.set_result(vecs[offset:end])
+            offset = end
+
+
+embedding_batcher = DynamicBatcher(
+    embed_texts,
+    max_batch=EMBED_MAX_BATCH,
+    max_wait=EMBED_MAX_WAIT_MS / 1000,
+    workers=EMBED_WORKERS,
+)
@@ -2,6 +2,7 @@
 Model service for LLM provider management.
 Handles model resolution and listing available models.
 """
+from functools import lru_cache
 from typing import Tuple, Dict, List
 from ..openai_client import MODEL as DEFAULT_OPENAI_MODEL
 
@@ -11,6 +12,11 @@ AVAILABLE_MODELS = {
     "ollama": ["qwen2.5:7b"],
 }
 
+# (provider, model) pairs for O(1) membership checks
+_MODEL_INDEX = frozenset(
+    (provider, model) for provider, models in AVAILABLE_MODELS.items() for model in models
+)
+
 
 def get_available_models() -> Dict[str, List[str]]:
     """
@@ -22,6 +28,7 @@ def get_available_models() -> Dict[str, List[str]]:
     return AVAILABLE_MODELS
 
 
+@lru_cache(maxsize=32)
 def resolve_model(model_string: str = None) -> Tuple[str, str]:
     """
     Resolve a model string to provider and model name.
@@ -42,16 +49,18 @@ def resolve_model(model_string: str = None) -> Tuple[str, str]:
         
         >>> resolve_model(None)
         ("openai", "gpt-4o-mini")  # defaults
+    
+    Results are memoized: only a handful of distinct model strings are seen.
     """
     if not model_string:
         return "openai", DEFAULT_OPENAI_MODEL
     
     if model_string.startswith("openai:"):
         provider = "openai"
-        model_name = model_string.replace("openai:", "")
+        model_name = model_string[len("openai:"):]
     elif model_string.startswith("ollama:"):
         provider = "ollama"
-        model_name = model_string.replace("ollama:", "")
+        model_name = model_string[len("ollama:"):]
     else:
         # Fallback to default if format is unexpected
         return "openai", DEFAULT_OPENAI_MODEL
@@ -70,7 +79,4 @@ def validate_model(provider: str, model_name: str) -> bool:
     Returns:
         True if model is available, False otherwise
     """
-    return (
-        provider in AVAILABLE_MODELS 
-        and model_name in AVAILABLE_MODELS[provider]
-    )
+    return (provider, model_name) in _MODEL_INDEX
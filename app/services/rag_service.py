@@ -2,29 +2,378 @@
 RAG (Retrieval-Augmented Generation) service.
 Handles document retrieval, context building, and streaming responses.
 """
-import json
+import asyncio
+import hashlib
+import re
+import textwrap
+import threading
 import time
-from typing import AsyncGenerator, List, Dict, Optional
-from time import perf_counter
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AsyncGenerator, AsyncIterator, List, Dict, Optional, Tuple
+from time import monotonic, perf_counter
+
+import numpy as np
+import orjson
 from ..schemas import AskBody
-from ..services.conversation_service import create_conversation, store_message
+from ..services.conversation_service import create_conversation_with_first_message, store_message
 from ..services.model_service import resolve_model
-from ..retrieval import search_similar
+from ..retrieval import embed_query, normalize_query, search_similar
+from ..embedding import embed_texts
 from ..utils.helpers import dedupe_sources as _dedupe_sources
 from ..openai_client import client as openai_client
-from ..logging_config import logger
-from ..db import engine
-from sqlalchemy import text
+from ..ollama_client import stream_ollama_chat
+from ..logging_config import is_debug_enabled, logger
+from ..state import corpus_version, has_documents_async
+
+# SSE framing, built once; events are encoded straight to bytes with orjson
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_DONE_FRAME = b'data: {"type":"done"}\n\n'
+# Delta frames only vary in the text, so only the text is encoded per frame
+_DELTA_PREFIX = b'data: {"type":"delta","text":'
+_DELTA_SUFFIX = b'}\n\n'
+
+
+# System prompt for grounded answers, built once at import; dedented so the
+# source indentation isn't sent to the model as prompt tokens
+_RAG_SYSTEM_PROMPT = textwrap.dedent("""
+            You are a strict Document Grounding Assistant.
+
+            Your job is to answer ONLY using the information found in the CONTEXT provided below.
+
+            You MUST follow these rules:
+
+            1. Use ONLY the text from the CONTEXT. 
+            - Do NOT add examples, do NOT guess, do NOT include general knowledge.
+            - If the user asks something that is not explicitly in the CONTEXT, answer:
+                "I don't have information about that in the uploaded documents."
+
+            2. When answering:
+            - First QUOTE the exact sentence(s) from the CONTEXT that support your answer.
+            - Then give a SHORT summary in your own words.
+            This prevents hallucination.
+
+            3. If the CONTEXT contains partial information:
+            - Only summarize what IS present.
+            - Do NOT expand the answer with assumptions.
+
+            4. If the answer requires a list:
+            - Only list items that appear EXACTLY in the CONTEXT.
+            - Never invent items (e.g., Visa, PayPal, etc.) unless they appear verbatim.
+
+            5. Respond ONLY in English.
+
+            6. If the CONTEXT is irrelevant to the question:
+            - Say: "I don't have information about that in the uploaded documents."
+
+            7. Never use ANY external knowledge, even if the answer is obvious.
+
+            Your format MUST be:
+
+            <your summary>
+
+            If no evidence exists, return:
+            "I don't have information about that in the uploaded documents."
+        """).strip()
+_RAG_SYSTEM_MESSAGE = {"role": "system", "content": _RAG_SYSTEM_PROMPT}
+
+_GREETING_SYSTEM_PROMPT = textwrap.dedent("""
+            You are a helpful document assistant. You help users understand their uploaded documents.
+
+            LANGUAGE REQUIREMENT:
+            - You MUST respond in English ONLY
+            - Even if the user greets you in another language (Hindi, Spanish, etc.), respond in English
+            - Example: User says 'Namaste' → You respond 'Hello! How can I help you?'
+
+            The user is asking a greeting or general help question. Respond warmly and explain your capabilities:
+            - You can answer questions about uploaded documents (PDF, DOCX, TXT)
+            - You analyze document content and provide accurate answers
+            - You cite sources from the documents
+            - Users should upload documents first, then ask questions about them
+
+            Be friendly and concise. Don't mention technical details.
+            ALWAYS respond in English, regardless of the user's language.
+        """).strip()
+_GREETING_SYSTEM_MESSAGE = {"role": "system", "content": _GREETING_SYSTEM_PROMPT}
+
+_NO_DOCUMENTS_MESSAGE = (
+    "Please upload documents first before asking questions. "
+    "Go to the 'Documents' tab to upload PDF, DOCX, or TXT files."
+)
+_NOT_FOUND_MESSAGE = (
+    "I don't have information about that in the uploaded documents. "
+    "Try asking a more specific question, or upload relevant documents first."
+)
+
+
+def _sse(event: Dict) -> bytes:
+    """Encode one event as an SSE data frame."""
+    return _SSE_PREFIX + orjson.dumps(event) + _SSE_SUFFIX
+
 
+def _sse_delta(text: str) -> bytes:
+    """Encode a text delta frame; orjson.dumps(str) gives the quoted, escaped string."""
+    return _DELTA_PREFIX + orjson.dumps(text) + _DELTA_SUFFIX
 
-def _has_any_documents() -> bool:
-    """Check if there are any documents in the database."""
-    with engine.begin() as conn:
-        result = conn.execute(text("SELECT COUNT(*) FROM documents")).scalar()
-        return result > 0
+
+# Deltas are sent in micro-batches: a batch is flushed once it holds this many
+# deltas or characters, or when this many seconds have passed since its first
+# delta arrived (even if the model has gone quiet). The very first delta of a
+# stream goes out immediately to keep time-to-first-token low.
+_COALESCE_MAX_DELTAS = 8
+_COALESCE_MAX_CHARS = 64
+_COALESCE_MAX_WAIT = 0.02
+
+_STREAM_END = object()
+
+
+async def _coalesce(deltas: AsyncIterator[str]) -> AsyncGenerator[str, None]:
+    """
+    Merge consecutive LLM text deltas so each SSE frame carries several tokens.
+    
+    The upstream stream is drained by a separate task into a queue, so a
+    batch is flushed on time rather than waiting for the next token.
+    
+    Args:
+        deltas: Text deltas from _stream_openai / _stream_ollama
+        
+    Yields:
+        Joined text; everything buffered is flushed when the stream ends
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for delta in deltas:
+                queue.put_nowait(delta)
+        finally:
+            queue.put_nowait(_STREAM_END)
+
+    producer = asyncio.create_task(pump())
+    try:
+        buf: List[str] = []
+        buf_len = 0
+        deadline = 0.0
+        first = True
+        while True:
+            timeout = max(0.0, deadline - monotonic()) if buf else None
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+            if item is _STREAM_END:
+                break
+            if item is not None:
+                if not buf:
+                    deadline = monotonic() + _COALESCE_MAX_WAIT
+                buf.append(item)
+                buf_len += len(item)
+            if (
+                item is None
+                or first
+                or len(buf) >= _COALESCE_MAX_DELTAS
+                or buf_len >= _COALESCE_MAX_CHARS
+            ):
+                yield "".join(buf)
+                buf.clear()
+                buf_len = 0
+                first = False
+        if buf:
+            yield "".join(buf)
+        # Re-raise any error from the upstream stream
+        await producer
+    finally:
+        producer.cancel()
+
+
+# Grounded answers to repeated questions, keyed by a digest of the normalized
+# question plus retrieval/model settings and the corpus version, so an answer
+# built from a corpus that changed mid-request is never served. Value:
+# (sources, answer text). Only history-free questions are cached; cleared when
+# documents change.
+_ANSWER_CACHE_SIZE = 512
+_ANSWER_CACHE: "OrderedDict[bytes, Tuple[List[Dict], str]]" = OrderedDict()
+# Sync document routes clear the cache from the threadpool
+_answer_cache_lock = threading.Lock()
+
+
+def _answer_cache_key(question: str, payload: AskBody, provider: str, model_name: str) -> bytes:
+    """Digest of everything that determines a history-free RAG answer."""
+    raw = "\x00".join((
+        question.lower(), str(payload.top_k), repr(payload.min_score), provider, model_name,
+        str(corpus_version()),
+    ))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+def _get_cached_answer(key: bytes) -> Optional[Tuple[List[Dict], str]]:
+    """Look up a cached answer, marking it most recently used."""
+    with _answer_cache_lock:
+        cached = _ANSWER_CACHE.get(key)
+        if cached is not None:
+            _ANSWER_CACHE.move_to_end(key)
+        return cached
+
+
+def _cache_answer(key: bytes, sources: List[Dict], answer: str) -> None:
+    """Store an answer, evicting the least recently used one when full."""
+    with _answer_cache_lock:
+        _ANSWER_CACHE[key] = (sources, answer)
+        if len(_ANSWER_CACHE) > _ANSWER_CACHE_SIZE:
+            _ANSWER_CACHE.popitem(last=False)
+
+
+def clear_answer_cache() -> None:
+    """Drop all cached answers (called when documents are uploaded or deleted)."""
+    with _answer_cache_lock:
+        _ANSWER_CACHE.clear()
+
+
+# Retrieved context of each conversation's last grounded answer, reused by
+# short follow-ups ("why?", "tell me more") that refer back to it instead of
+# naming a new topic. Value: (corpus version, context, sources). Only touched
+# from the event loop, so no lock.
+_FOLLOWUP_CONTEXT_SIZE = 1024
+_FOLLOWUP_CONTEXT: "OrderedDict[int, Tuple[int, str, List[Dict]]]" = OrderedDict()
+_FOLLOWUP_MAX_WORDS = 4
+# A follow-up cue, then only words that point back at the previous answer;
+# any other word may name a new topic ("why is pricing high?"), which needs
+# a fresh search
+_FOLLOWUP_RE = re.compile(
+    r"^(?:tell me more|more|what else|continue|why|how so|how come|explain)"
+    r"((?:\s+(?:that|this|it|is|so|about|please|me|more|details?|further|again))*)"
+    r"[\s!.,?]*$",
+    re.IGNORECASE,
+)
+
+
+def _is_followup(question: str) -> bool:
+    """Whether a question is a short reference back to the previous answer."""
+    return len(question.split()) <= _FOLLOWUP_MAX_WORDS and bool(_FOLLOWUP_RE.match(question))
+
+
+def _remember_context(chat_id: int, context: str, sources: List[Dict]) -> None:
+    """Keep a conversation's latest context for follow-ups, evicting the oldest."""
+    _FOLLOWUP_CONTEXT[chat_id] = (corpus_version(), context, sources)
+    _FOLLOWUP_CONTEXT.move_to_end(chat_id)
+    if len(_FOLLOWUP_CONTEXT) > _FOLLOWUP_CONTEXT_SIZE:
+        _FOLLOWUP_CONTEXT.popitem(last=False)
+
+
+def _recall_context(chat_id: int) -> Optional[Tuple[str, List[Dict]]]:
+    """A conversation's latest (context, sources), unless documents changed since."""
+    entry = _FOLLOWUP_CONTEXT.get(chat_id)
+    if entry is None or entry[0] != corpus_version():
+        return None
+    return entry[1], entry[2]
+
+
+# Chunks kept for the context, and the score a chunk needs to be cited as a source
+_CONTEXT_CHUNKS = 5
+_SOURCE_MIN_SCORE = 0.30
+
+
+def _top_indices(scores: np.ndarray, mask: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores among those selected by mask.
+    
+    Args:
+        scores: Similarity scores, one per retrieved chunk
+        mask: Boolean array marking eligible chunks
+        k: Maximum number of indices to return
+        
+    Returns:
+        Indices into scores, ordered by descending score
+    """
+    candidates = np.flatnonzero(mask)
+    if candidates.size > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+# Local intent detection, tried before asking the LLM:
+# 1. whole-message patterns for obvious greetings / help requests
+_GREETING_RE = re.compile(
+    r"^(hi|hello|hey|hiya|yo|namaste|namaskar|salaam|salam|hola|bonjour|"
+    r"good (morning|afternoon|evening)|how are you|kaise ho)"
+    r"( there| all| everyone)?[\s!.,?]*$",
+    re.IGNORECASE,
+)
+_HELP_RE = re.compile(
+    r"^(help|what can you do|how does this work|what are you|who are you|"
+    r"how do i use this|what can i ask( you)?)[\s!.,?]*$",
+    re.IGNORECASE,
+)
+
+# 2. cosine similarity to exemplar centroids, used only to rule greetings and
+# help out: similarity alone can't tell "what can you tell me about the
+# refund policy" from a help request, so anything not clearly far from every
+# centroid goes to the LLM
+_INTENT_EXEMPLARS = {
+    "greeting": [
+        "hello", "hi there", "good morning", "how are you?",
+        "namaste", "hey, how's it going?", "nice to meet you",
+    ],
+    "help": [
+        "what can you do?", "how does this work?", "what are your capabilities?",
+        "how do I use this?", "what kind of questions can I ask?", "can you help me?",
+    ],
+}
+_INTENT_REJECT_SIM = 0.35
+
+
+@lru_cache(maxsize=1)
+def _intent_centroids():
+    """Unit-length centroid per intent, embedded on first use (the model loads in the background)."""
+    centroids = np.stack([embed_texts(texts).mean(axis=0) for texts in _INTENT_EXEMPLARS.values()])
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    return centroids
+
+
+@lru_cache(maxsize=1024)
+def _local_intent(question: str) -> Optional[str]:
+    """
+    Classify a question without the LLM.
+    
+    Args:
+        question: The stripped question, exactly as passed to retrieval
+        
+    Returns:
+        'greeting', 'help' or 'factual', or None when the LLM should decide
+    """
+    normalized = " ".join(question.split())
+    if _GREETING_RE.match(normalized):
+        return "greeting"
+    if _HELP_RE.match(normalized):
+        return "help"
+
+    # Same string search_similar embeds, so the cached embedding is shared
+    sims = _intent_centroids() @ embed_query(normalize_query(question))
+    if sims.max() <= _INTENT_REJECT_SIM:
+        return "factual"
+    return None
 
 
 async def _classify_question_intent(question: str, provider: str, model_name: str) -> str:
+    """
+    Classify the question intent, asking the LLM only when local checks are unsure.
+    Returns: 'greeting', 'help', or 'factual'
+    """
+    # The encoder runs in a worker thread: it blocks while the model is still
+    # preloading, and a forward pass would otherwise stall the event loop
+    try:
+        intent = await asyncio.to_thread(_local_intent, question)
+    except Exception as e:
+        logger.warning("Local intent classification failed", error=str(e))
+        intent = None
+    if intent is not None:
+        logger.info("Question classified locally", question=question[:50], intent=intent)
+        return intent
+    return await _classify_with_llm(question, provider, model_name)
+
+
+async def _classify_with_llm(question: str, provider: str, model_name: str) -> str:
     """
     Use the LLM to classify the question intent.
     Returns: 'greeting', 'help', or 'factual'
@@ -64,12 +413,8 @@ Classification:"""
         messages = [{"role": "user", "content": classification_prompt}]
         
         response_text = ""
-        if provider == "openai":
-            async for delta in _stream_openai(model_name, messages):
-                response_text += delta
-        else:  # ollama
-            async for delta in _stream_ollama(model_name, messages):
-                response_text += delta
+        async for delta in _STREAMERS[provider](model_name, messages):
+            response_text += delta
         
         # Extract classification
         intent = response_text.strip().lower()
@@ -89,7 +434,7 @@ Classification:"""
         return 'factual'
 
 
-async def handle_rag_query(payload: AskBody) -> AsyncGenerator[str, None]:
+async def handle_rag_query(payload: AskBody) -> AsyncGenerator[bytes, None]:
     """
     Main RAG query handler that orchestrates the entire flow.
     
@@ -97,7 +442,7 @@ async def handle_rag_query(payload: AskBody) -> AsyncGenerator[str, None]:
         payload: The request payload containing question and parameters
         
     Yields:
-        SSE-formatted strings for streaming to client
+        SSE-formatted frames (bytes) for streaming to client
     """
     start_time = time.time()
     question = payload.question.strip()
@@ -106,20 +451,60 @@ async def handle_rag_query(payload: AskBody) -> AsyncGenerator[str, None]:
     provider, model_name = resolve_model(payload.model)
     logger.info("Processing query", question=question, provider=provider, model=model_name)
     
-    # 2. Ensure conversation exists
+    # 2-3. Ensure conversation exists and store user message
+    # (a new conversation and its first message go in one round-trip);
+    # database calls run in worker threads so the event loop keeps serving
+    # other streams
     chat_id = payload.chat_id
     if chat_id is None:
-        chat_id = create_conversation()
-    
-    # 3. Store user message
-    store_message(chat_id, "user", question)
+        chat_id = await asyncio.to_thread(create_conversation_with_first_message, "user", question)
+    else:
+        await asyncio.to_thread(store_message, chat_id, "user", question)
+    
+    # Serve a repeated question from the answer cache, skipping
+    # classification, retrieval and generation
+    cache_key = None
+    if not payload.history:
+        cache_key = _answer_cache_key(question, payload, provider, model_name)
+        cached = _get_cached_answer(cache_key)
+        if cached is not None:
+            sources, answer = cached
+            async for event in _stream_cached_response(
+                answer, sources, chat_id, provider, model_name
+            ):
+                yield event
+            
+            elapsed_ms = round((time.time() - start_time) * 1000, 2)
+            logger.info("Query completed (answer cache hit)", time_ms=elapsed_ms)
+            return
+    
+    # A short follow-up on an existing conversation ("why?", "tell me more")
+    # reuses the previous turn's context, skipping classification and search
+    if payload.history and payload.chat_id is not None and _is_followup(question):
+        recalled = _recall_context(chat_id)
+        if recalled is not None:
+            context, sources = recalled
+            async for event in _stream_rag_response(
+                question=question,
+                context=context,
+                sources=sources,
+                chat_id=chat_id,
+                provider=provider,
+                model_name=model_name,
+                history=payload.history,
+            ):
+                yield event
+            
+            elapsed_ms = round((time.time() - start_time) * 1000, 2)
+            logger.info("Query completed (follow-up context reused)", time_ms=elapsed_ms)
+            return
     
     # 4. Classify question intent using LLM
     intent = await _classify_question_intent(question, provider, model_name)
     is_greeting_or_help = (intent in ['greeting', 'help'])
     
     # 5. Handle no documents case
-    if not _has_any_documents() and not is_greeting_or_help:
+    if not await has_documents_async() and not is_greeting_or_help:
         async for event in _stream_no_documents_response(
             chat_id,
             provider,
@@ -149,17 +534,18 @@ async def handle_rag_query(payload: AskBody) -> AsyncGenerator[str, None]:
         return
     
     # 7. Search for relevant document chunks
-    chunks = search_similar(question, top_k=payload.top_k)
+    chunks, scores = await asyncio.to_thread(search_similar, question, payload.top_k)
     logger.info("Retrieved chunks", count=len(chunks))
     
-    strong_chunks = [c for c in chunks if float(c["score"]) >= payload.min_score]
-    if not strong_chunks and chunks:
-        # If nothing meets threshold, take top 2
-        strong_chunks = chunks[:2]
-
+    # Filter by threshold and keep the top chunks, working on the score array
+    top_idx = _top_indices(scores, scores >= payload.min_score, _CONTEXT_CHUNKS)
+    if not top_idx.size:
+        # If nothing meets threshold, take top 2 (rows already arrive best first)
+        top_idx = np.arange(min(2, len(chunks)))
+    sorted_chunks = [chunks[i] for i in top_idx]
     
     # 8. Handle case with no relevant documents
-    if not strong_chunks:
+    if not sorted_chunks:
         async for event in _stream_not_found_response(
             chat_id, 
             provider, 
@@ -173,34 +559,32 @@ async def handle_rag_query(payload: AskBody) -> AsyncGenerator[str, None]:
         return
     
     # 9. Build context and stream response
-    # Sort and take top chunks for context
-    sorted_chunks = sorted(strong_chunks, key=lambda c: c["score"], reverse=True)[:5]
-    
-    # Filter to only show sources from relevant chunks (score >= 0.30)
+    # Filter to only show sources from relevant chunks (score >= _SOURCE_MIN_SCORE)
     # This prevents showing completely irrelevant documents in sources
-    relevant_chunks = [c for c in sorted_chunks if float(c["score"]) >= 0.30]
+    relevant_chunks = [chunks[i] for i in top_idx[scores[top_idx] >= _SOURCE_MIN_SCORE]]
     
     # If no chunks meet threshold, don't show sources at all
     # Better to say "I don't have information" than show irrelevant sources
     if not relevant_chunks:
         logger.info("No chunks met relevance threshold", 
-                   min_threshold=0.30,
-                   best_score=sorted_chunks[0]["score"] if sorted_chunks else None)
-    
-    # Debug logging
-    logger.info(
-        "Selected chunks for context",
-        total_strong_chunks=len(strong_chunks),
-        used_chunks=len(sorted_chunks),
-        chunk_files=[c.get("filename") for c in sorted_chunks],
-        relevant_for_sources=len(relevant_chunks)
-    )
+                   min_threshold=_SOURCE_MIN_SCORE,
+                   best_score=float(scores[top_idx[0]]))
     
     # Only show sources from highly relevant chunks
     sources = _dedupe_sources(relevant_chunks)
-    logger.info("Deduplicated sources", sources=sources)
+    
+    # Debug logging (payloads are only built when debug logs are emitted)
+    if is_debug_enabled():
+        logger.debug(
+            "Selected chunks for context",
+            used_chunks=len(sorted_chunks),
+            chunk_files=[c.get("filename") for c in sorted_chunks],
+            relevant_for_sources=len(relevant_chunks)
+        )
+        logger.debug("Deduplicated sources", sources=sources)
     
     context = _build_context(sorted_chunks)
+    _remember_context(chat_id, context, sources)
     
     async for event in _stream_rag_response(
         question=question,
@@ -209,7 +593,8 @@ async def handle_rag_query(payload: AskBody) -> AsyncGenerator[str, None]:
         chat_id=chat_id,
         provider=provider,
         model_name=model_name,
-        history=payload.history  # Pass conversation history
+        history=payload.history,  # Pass conversation history
+        cache_key=cache_key,
     ):
         yield event
     
@@ -227,13 +612,11 @@ def _build_context(chunks: List[Dict]) -> str:
     Returns:
         Formatted context string
     """
-    # Build numbered context from provided chunks
-    context_parts = []
-    for i, chunk in enumerate(chunks, start=1):
-        content = chunk["content"][:800]  # Limit to 800 chars per chunk
-        context_parts.append(f"[{i}] {content}")
-    
-    return "\n\n---\n\n".join(context_parts)
+    # Build numbered context in one join; retrieval already limits content
+    # to 800 chars per chunk
+    return "\n\n---\n\n".join(
+        f"[{i}] {chunk['content']}" for i, chunk in enumerate(chunks, start=1)
+    )
 
 
 async def _stream_greeting_response(
@@ -242,7 +625,7 @@ async def _stream_greeting_response(
     provider: str,
     model_name: str,
     history: Optional[List[Dict]] = None
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """
     Stream a friendly response for greetings and help questions.
     Uses the LLM to respond naturally without document context.
@@ -255,40 +638,17 @@ async def _stream_greeting_response(
         history: Optional conversation history
         
     Yields:
-        SSE-formatted event strings
+        SSE-formatted event frames (bytes)
     """
     # Send empty sources (no documents needed for greetings)
     meta_event = {"type": "meta", "sources": []}
-    yield f"data: {json.dumps(meta_event)}\n\n"
+    yield _sse(meta_event)
     
-    # Build messages for LLM (same prompt as regular RAG but without context)
-    system_prompt = (
-        "You are a helpful document assistant. You help users understand their uploaded documents.\n\n"
-        
-        "LANGUAGE REQUIREMENT:\n"
-        "- You MUST respond in English ONLY\n"
-        "- Even if the user greets you in another language (Hindi, Spanish, etc.), respond in English\n"
-        "- Example: User says 'Namaste' → You respond 'Hello! How can I help you?'\n\n"
-        
-        "The user is asking a greeting or general help question. Respond warmly and explain your capabilities:\n"
-        "- You can answer questions about uploaded documents (PDF, DOCX, TXT)\n"
-        "- You analyze document content and provide accurate answers\n"
-        "- You cite sources from the documents\n"
-        "- Users should upload documents first, then ask questions about them\n\n"
-        
-        "Be friendly and concise. Don't mention technical details.\n"
-        "ALWAYS respond in English, regardless of the user's language."
-    )
+    messages = [_GREETING_SYSTEM_MESSAGE]
     
-    messages = [{"role": "system", "content": system_prompt}]
-    
-    # Add conversation history if provided
+    # Add conversation history if provided (already validated by AskBody)
     if history:
-        for turn in history:
-            messages.append({
-                "role": turn.role,
-                "content": turn.content
-            })
+        messages.extend({"role": turn.role, "content": turn.content} for turn in history)
     
     # Add current question
     messages.append({
@@ -301,17 +661,14 @@ async def _stream_greeting_response(
     # Stream response from LLM
     full_response = ""
     
-    if provider == "openai":
-        async for delta in _stream_openai(model_name, messages):
-            full_response += delta
-            yield f'data: {json.dumps({"type": "delta", "text": delta})}\n\n'
-    else:  # ollama
-        async for delta in _stream_ollama(model_name, messages):
-            full_response += delta
-            yield f'data: {json.dumps({"type": "delta", "text": delta})}\n\n'
+    streamer = _STREAMERS[provider]
+    async for piece in _coalesce(streamer(model_name, messages, f"chat:{chat_id}")):
+        full_response += piece
+        yield _sse_delta(piece)
     
     # Store assistant message
-    timestamp = store_message(
+    timestamp = await asyncio.to_thread(
+        store_message,
         chat_id,
         "assistant",
         full_response,
@@ -329,10 +686,10 @@ async def _stream_greeting_response(
         "model_provider": provider,
         "model_name": model_name,
         "conversation_id": chat_id,
-        "timestamp": timestamp.isoformat() if timestamp else None,
+        "timestamp": timestamp,  # orjson encodes datetimes as ISO 8601
     }
-    yield f"data: {json.dumps(final_event)}\n\n"
-    yield 'data: {"type":"done"}\n\n'
+    yield _sse(final_event)
+    yield _DONE_FRAME
 
 
 async def _stream_no_documents_response(
@@ -340,7 +697,7 @@ async def _stream_no_documents_response(
     provider: str,
     model_name: str,
     history: Optional[List[Dict]] = None
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """
     Stream a response when no documents have been uploaded yet.
     
@@ -351,22 +708,18 @@ async def _stream_no_documents_response(
         history: Optional conversation history
         
     Yields:
-        SSE-formatted event strings
+        SSE-formatted event frames (bytes)
     """
-    no_docs_message = (
-        "Please upload documents first before asking questions. "
-        "Go to the 'Documents' tab to upload PDF, DOCX, or TXT files."
-    )
-    
     # Send empty sources
     meta_event = {"type": "meta", "sources": []}
-    yield f"data: {json.dumps(meta_event)}\n\n"
+    yield _sse(meta_event)
     
     # Store assistant message
-    timestamp = store_message(
+    timestamp = await asyncio.to_thread(
+        store_message,
         chat_id, 
         "assistant", 
-        no_docs_message,
+        _NO_DOCUMENTS_MESSAGE,
         model_provider=provider,
         model_name=model_name,
         sources=[]
@@ -375,16 +728,16 @@ async def _stream_no_documents_response(
     # Send final event
     final_event = {
         "type": "final",
-        "text": no_docs_message,
+        "text": _NO_DOCUMENTS_MESSAGE,
         "grounded": False,
         "sources": [],
         "model_provider": provider,
         "model_name": model_name,
         "conversation_id": chat_id,
-        "timestamp": timestamp.isoformat() if timestamp else None,
+        "timestamp": timestamp,  # orjson encodes datetimes as ISO 8601
     }
-    yield f"data: {json.dumps(final_event)}\n\n"
-    yield 'data: {"type":"done"}\n\n'
+    yield _sse(final_event)
+    yield _DONE_FRAME
 
 
 async def _stream_not_found_response(
@@ -392,7 +745,7 @@ async def _stream_not_found_response(
     provider: str,
     model_name: str,
     history: Optional[List[Dict]] = None
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """
     Stream a 'not found' response when no relevant documents exist.
     
@@ -403,22 +756,18 @@ async def _stream_not_found_response(
         history: Optional conversation history
         
     Yields:
-        SSE-formatted event strings
+        SSE-formatted event frames (bytes)
     """
-    no_info_message = (
-        "I don't have information about that in the uploaded documents. "
-        "Try asking a more specific question, or upload relevant documents first."
-    )
-    
     # Send empty sources
     meta_event = {"type": "meta", "sources": []}
-    yield f"data: {json.dumps(meta_event)}\n\n"
+    yield _sse(meta_event)
     
     # Store assistant message
-    timestamp = store_message(
+    timestamp = await asyncio.to_thread(
+        store_message,
         chat_id, 
         "assistant", 
-        no_info_message,
+        _NOT_FOUND_MESSAGE,
         model_provider=provider,
         model_name=model_name,
         sources=[]
@@ -427,16 +776,16 @@ async def _stream_not_found_response(
     # Send final event
     final_event = {
         "type": "final",
-        "text": no_info_message,
+        "text": _NOT_FOUND_MESSAGE,
         "grounded": False,
         "sources": [],
         "model_provider": provider,
         "model_name": model_name,
         "conversation_id": chat_id,
-        "timestamp": timestamp.isoformat() if timestamp else None,
+        "timestamp": timestamp,  # orjson encodes datetimes as ISO 8601
     }
-    yield f"data: {json.dumps(final_event)}\n\n"
-    yield 'data: {"type":"done"}\n\n'
+    yield _sse(final_event)
+    yield _DONE_FRAME
 
 
 async def _stream_rag_response(
@@ -446,8 +795,9 @@ async def _stream_rag_response(
     chat_id: int,
     provider: str,
     model_name: str,
-    history: Optional[List[Dict]] = None
-) -> AsyncGenerator[str, None]:
+    history: Optional[List[Dict]] = None,
+    cache_key: Optional[bytes] = None
+) -> AsyncGenerator[bytes, None]:
     """
     Stream a RAG response with context from retrieved documents.
     
@@ -459,96 +809,49 @@ async def _stream_rag_response(
         provider: The LLM provider
         model_name: The model name
         history: Optional conversation history (list of {role, content} dicts)
+        cache_key: Answer-cache key to store the completed answer under, if any
         
     Yields:
-        SSE-formatted event strings
+        SSE-formatted event frames (bytes)
     """
     # Send sources metadata first
     meta_event = {"type": "meta", "sources": sources}
-    yield f"data: {json.dumps(meta_event)}\n\n"
+    yield _sse(meta_event)
     
     # Build messages for LLM
-    system_prompt = (
-        """
-            You are a strict Document Grounding Assistant.
-
-            Your job is to answer ONLY using the information found in the CONTEXT provided below.
-
-            You MUST follow these rules:
-
-            1. Use ONLY the text from the CONTEXT. 
-            - Do NOT add examples, do NOT guess, do NOT include general knowledge.
-            - If the user asks something that is not explicitly in the CONTEXT, answer:
-                "I don't have information about that in the uploaded documents."
-
-            2. When answering:
-            - First QUOTE the exact sentence(s) from the CONTEXT that support your answer.
-            - Then give a SHORT summary in your own words.
-            This prevents hallucination.
-
-            3. If the CONTEXT contains partial information:
-            - Only summarize what IS present.
-            - Do NOT expand the answer with assumptions.
-
-            4. If the answer requires a list:
-            - Only list items that appear EXACTLY in the CONTEXT.
-            - Never invent items (e.g., Visa, PayPal, etc.) unless they appear verbatim.
-
-            5. Respond ONLY in English.
-
-            6. If the CONTEXT is irrelevant to the question:
-            - Say: "I don't have information about that in the uploaded documents."
-
-            7. Never use ANY external knowledge, even if the answer is obvious.
-
-            Your format MUST be:
-
-            <your summary>
-
-            If no evidence exists, return:
-            "I don't have information about that in the uploaded documents."
-        """
-    )
-    
-    messages = [{"role": "system", "content": system_prompt}]
+    # Shared read-only system message; nothing downstream mutates it
+    messages = [_RAG_SYSTEM_MESSAGE]
     t = perf_counter()
-    # Add conversation history if provided
+    # Add conversation history if provided (already validated by AskBody)
     if history:
-        for turn in history:
-            messages.append({
-                "role": turn.role,      # Access as object attribute, not dict
-                "content": turn.content  # Access as object attribute, not dict
-            })
+        messages.extend({"role": turn.role, "content": turn.content} for turn in history)
     
-    # Add current question with context
+    # Add current question with context; the context goes first so turns that
+    # retrieve the same chunks share a longer cacheable prompt prefix
     messages.append({
         "role": "user", 
-        "content": f"QUESTION: {question}\n\nCONTEXT:\n{context}"
+        "content": f"CONTEXT:\n{context}\n\nQUESTION: {question}"
     })
     
-    logger.info("Sending to LLM", 
-                question=question,
-                context_length=len(context),
-                context_preview=context[:200] + "..." if len(context) > 200 else context,
-                history_turns=len(history) if history else 0,
-                sources_count=len(sources))
+    if is_debug_enabled():
+        logger.debug("Sending to LLM", 
+                     question=question,
+                     context_length=len(context),
+                     context_preview=context[:200] + "..." if len(context) > 200 else context,
+                     history_turns=len(history) if history else 0,
+                     sources_count=len(sources))
     
     # Stream response from LLM
     full_response = ""
     
-    if provider == "openai":
-        
-        async for delta in _stream_openai(model_name, messages):
-            full_response += delta
-            yield f'data: {json.dumps({"type": "delta", "text": delta})}\n\n'
-            
-    elif provider == "ollama":
-        async for delta in _stream_ollama(model_name, messages):
-            full_response += delta
-            yield f'data: {json.dumps({"type": "delta", "text": delta})}\n\n'
+    streamer = _STREAMERS[provider]
+    async for piece in _coalesce(streamer(model_name, messages, f"chat:{chat_id}")):
+        full_response += piece
+        yield _sse_delta(piece)
     
     # Store assistant message
-    timestamp = store_message(
+    timestamp = await asyncio.to_thread(
+        store_message,
         chat_id,
         "assistant",
         full_response.strip(),
@@ -558,6 +861,9 @@ async def _stream_rag_response(
     )
     logger.info("Received response from LLM in %.2f seconds", perf_counter() - t)
     logger.info("model used -> %s", model_name)
+    
+    if cache_key is not None and full_response.strip():
+        _cache_answer(cache_key, sources, full_response.strip())
     # Send final event
     final_event = {
         "type": "final",
@@ -567,50 +873,118 @@ async def _stream_rag_response(
         "model_provider": provider,
         "model_name": model_name,
         "conversation_id": chat_id,
-        "timestamp": timestamp.isoformat() if timestamp else None,
+        "timestamp": timestamp,  # orjson encodes datetimes as ISO 8601
     }
-    yield f"data: {json.dumps(final_event)}\n\n"
-    yield 'data: {"type":"done"}\n\n'
+    yield _sse(final_event)
+    yield _DONE_FRAME
 
 
-async def _stream_openai(model_name: str, messages: List[Dict]) -> AsyncGenerator[str, None]:
+async def _stream_cached_response(
+    answer: str,
+    sources: List[Dict],
+    chat_id: int,
+    provider: str,
+    model_name: str
+) -> AsyncGenerator[bytes, None]:
+    """
+    Replay a cached RAG answer as a single delta, recording it in the conversation.
+    
+    Args:
+        answer: The cached answer text
+        sources: The sources the answer was grounded in
+        chat_id: The conversation ID
+        provider: The LLM provider
+        model_name: The model name
+        
+    Yields:
+        SSE-formatted event frames (bytes)
+    """
+    yield _sse({"type": "meta", "sources": sources})
+    yield _sse_delta(answer)
+    
+    timestamp = await asyncio.to_thread(
+        store_message,
+        chat_id,
+        "assistant",
+        answer,
+        model_provider=provider,
+        model_name=model_name,
+        sources=sources
+    )
+    
+    final_event = {
+        "type": "final",
+        "text": answer,
+        "grounded": True,
+        "sources": sources,
+        "model_provider": provider,
+        "model_name": model_name,
+        "conversation_id": chat_id,
+        "timestamp": timestamp,  # orjson encodes datetimes as ISO 8601
+    }
+    yield _sse(final_event)
+    yield _DONE_FRAME
+
+
+async def _stream_openai(
+    model_name: str,
+    messages: List[Dict],
+    cache_key: Optional[str] = None
+) -> AsyncGenerator[str, None]:
     """
     Stream responses from OpenAI API.
     
     Args:
         model_name: The OpenAI model to use
         messages: The conversation messages
+        cache_key: Optional prompt_cache_key; requests sharing it are routed
+                   to the same prompt cache, so a conversation's repeated
+                   prefix (system prompt + history) isn't prefilled again
         
     Yields:
         Text deltas from the streaming response
     """
     logger.info("Sent request to OpenAI API")
-    stream_response = openai_client.chat.completions.create(
+    stream_response = await openai_client.chat.completions.create(
         model=model_name,
         messages=messages,
         temperature=0.2,
         stream=True,
+        extra_body={"prompt_cache_key": cache_key} if cache_key else None,
     )
     
-    for chunk in stream_response:
+    async for chunk in stream_response:
         delta = chunk.choices[0].delta.content or ""
         if delta:
             yield delta
 
 
-async def _stream_ollama(model_name: str, messages: List[Dict]) -> AsyncGenerator[str, None]:
+async def _stream_ollama(
+    model_name: str,
+    messages: List[Dict],
+    cache_key: Optional[str] = None
+) -> AsyncGenerator[str, None]:
     """
     Stream responses from Ollama API.
     
     Args:
         model_name: The Ollama model to use
         messages: The conversation messages
+        cache_key: Accepted for parity with _stream_openai; Ollama reuses
+                   the KV cache of the loaded model on its own
         
     Yields:
         Text deltas from the streaming response
     """
-    from ..ollama_client import stream_ollama_chat
     logger.info("Sent request to Ollama model")
     async for delta_event in stream_ollama_chat(model_name, messages):
         if delta_event.get("type") == "delta":
-            yield delta_event["text"]
\ No newline at end of file
+            yield delta_event["text"]
+
+
+# Provider -> text-delta streamer; every streamer takes
+# (model_name, messages, cache_key=None)
+_STREAMERS = {
+    "openai": _stream_openai,
+    "ollama": _stream_ollama,
+}
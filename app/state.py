@@ -0,0 +1,80 @@
+"""
+Process-wide cached state.
+
+Keeps per-question checks off the database: whether any documents exist is
+read from memory and refreshed after uploads/deletes or once the TTL expires
+(other workers may have changed the table). The corpus version counts
+uploads/deletes so caches of search results can key on it.
+"""
+import asyncio
+import os
+import threading
+from time import monotonic
+from typing import Optional
+
+from sqlalchemy import text
+
+from .db import engine
+
+HAS_DOCUMENTS_TTL = float(os.getenv("HAS_DOCUMENTS_TTL", "30"))  # seconds
+
+_HAS_DOCUMENTS_SQL = text("SELECT EXISTS (SELECT 1 FROM documents)")
+
+_has_documents: Optional[bool] = None
+_checked_at = 0.0
+_corpus_version = 0
+_lock = threading.Lock()
+
+
+def refresh_has_documents() -> bool:
+    """Re-read whether any documents exist and cache the result."""
+    global _has_documents, _checked_at
+    with engine.begin() as conn:
+        value = bool(conn.execute(_HAS_DOCUMENTS_SQL).scalar())
+    with _lock:
+        _has_documents = value
+        _checked_at = monotonic()
+    return value
+
+
+def _cached_has_documents() -> Optional[bool]:
+    """The cached flag, or None when it is unset or older than the TTL."""
+    with _lock:
+        if _has_documents is not None and monotonic() - _checked_at < HAS_DOCUMENTS_TTL:
+            return _has_documents
+    return None
+
+
+async def has_documents_async() -> bool:
+    """Cached check for whether any documents exist; a due refresh runs in a worker thread."""
+    cached = _cached_has_documents()
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(refresh_has_documents)
+
+
+def mark_has_documents() -> None:
+    """Record that documents exist (called after a successful upload)."""
+    global _has_documents, _checked_at
+    with _lock:
+        _has_documents = True
+        _checked_at = monotonic()
+
+
+def invalidate_has_documents() -> None:
+    """Force the next check to hit the database (called after a delete)."""
+    global _has_documents
+    with _lock:
+        _has_documents = None
+
+
+def corpus_version() -> int:
+    """Counter that changes whenever documents are added or removed."""
+    return _corpus_version
+
+
+def bump_corpus_version() -> None:
+    """Invalidate cached search results (called after uploads and deletes)."""
+    global _corpus_version
+    with _lock:
+        _corpus_version += 1
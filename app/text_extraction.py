@@ -1,35 +1,42 @@
-from typing import Tuple
+from typing import BinaryIO, Iterable, Iterator, Union
 from pypdf import PdfReader
 from docx import Document as DocxDocument
 
-def read_text_from_pdf(file_path: str) -> str:
-    pdf = PdfReader(file_path)
-    parts = []
-    for page in pdf.pages:
-        parts.append(page.extract_text() or "")
-    return "\n".join(parts)
+# A filesystem path or an open binary file (e.g. UploadFile.file)
+Source = Union[str, BinaryIO]
 
-def read_text_from_docx(file_path: str) -> str:
+def iter_text_from_pdf(source: Source) -> Iterator[str]:
+    """Yield page texts (with newline separators) one page at a time."""
+    for n, page in enumerate(PdfReader(source).pages):
+        if n:
+            yield "\n"
+        yield page.extract_text() or ""
+
+def iter_text_from_docx(source: Source) -> Iterator[str]:
     """
-    Extract text from DOCX file including both paragraphs and tables.
-    Tables are converted to readable text format.
+    Yield DOCX text one paragraph / table at a time (with blank-line
+    separators), paragraphs first, then tables as readable text.
     """
-    doc = DocxDocument(file_path)
-    parts = []
+    doc = DocxDocument(source)
+    first = True
     
     # Extract all paragraphs
     for para in doc.paragraphs:
         text = para.text.strip()
         if text:
-            parts.append(text)
+            if not first:
+                yield "\n\n"
+            first = False
+            yield text
     
     # Extract all tables
     for table in doc.tables:
         table_text = extract_table_text(table)
         if table_text:
-            parts.append("\n" + table_text)
-    
-    return "\n\n".join(parts)
+            if not first:
+                yield "\n\n"
+            first = False
+            yield "\n" + table_text
 
 def extract_table_text(table) -> str:
     """
@@ -52,74 +59,134 @@ def extract_table_text(table) -> str:
     
     return "\n".join(lines)
 
-def read_text_from_txt(file_path: str, encoding="utf-8") -> str:
-    with open(file_path, "r", encoding=encoding, errors="ignore") as f:
-        return f.read()
-
-def read_any(file_path: str, mime: str, filename: str) -> Tuple[str, str]:
-    name = filename.lower()
-    if name.endswith(".pdf") or mime == "application/pdf":
-        return read_text_from_pdf(file_path), "pdf"
-    if name.endswith(".docx") or mime in ("application/vnd.openxmlformats-officedocument.wordprocessingml.document",):
-        return read_text_from_docx(file_path), "docx"
-    # default to txt
-    return read_text_from_txt(file_path), "txt"
+def read_text_from_txt(source: Source, encoding="utf-8") -> str:
+    if isinstance(source, str):
+        with open(source, "r", encoding=encoding, errors="ignore") as f:
+            return f.read()
+    return source.read().decode(encoding, errors="ignore")
 
-def simple_chunks(text: str, target_chars: int = 1200, overlap: int = 150):
+class TextChunker:
     """
-    Split text into chunks with overlap.
-    Improved to avoid creating too many tiny chunks.
-    Preserves line breaks for better structure.
+    Incremental version of the chunking rules in simple_chunks.
+
+    Text is fed in segments (e.g. one PDF page at a time); a chunk is emitted
+    as soon as enough text follows it that the cut can no longer change, so
+    only about one chunk window is buffered. Output is identical to chunking
+    the concatenated text in one go.
     """
-    # Normalize spaces within lines but preserve line breaks
-    lines = text.split('\n')
-    normalized_lines = [' '.join(line.split()) for line in lines]
-    text = '\n'.join(normalized_lines)
-    
-    n = len(text)
-    
-    # If text is shorter than target, return as single chunk
-    if n <= target_chars:
-        yield text
-        return
-    
-    i = 0
-    while i < n:
-        # Calculate end position
-        j = min(i + target_chars, n)
-        
-        # If we're near the end, just take the rest
-        if j >= n - overlap:
-            yield text[i:].strip()
-            break
-        
-        # Try to cut on paragraph boundary (double newline)
-        k = text.rfind('\n\n', i, j)
-        if k != -1:
-            k += 2
-        else:
-            # Try to cut on single newline
+
+    def __init__(self, target_chars: int = 1200, overlap: int = 150):
+        self.target_chars = target_chars
+        self.overlap = overlap
+        self._buf = ""        # normalized text from the current chunk start
+        self._pending = ""    # raw text after the last newline seen
+        self._advanced = False
+
+    def feed(self, segment: str) -> Iterator[str]:
+        """Add text and yield every chunk that is now final."""
+        lines = (self._pending + segment).split('\n')
+        self._pending = lines.pop()
+        if lines:
+            # Normalize spaces within lines but preserve line breaks
+            self._buf += "".join(' '.join(line.split()) + '\n' for line in lines)
+        return self._drain(final=False)
+
+    def finish(self) -> Iterator[str]:
+        """Yield the remaining chunks once all text has been fed."""
+        self._buf += ' '.join(self._pending.split())
+        self._pending = ""
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> Iterator[str]:
+        text = self._buf
+        n = len(text)
+        target_chars, overlap = self.target_chars, self.overlap
+
+        # If text is shorter than target, return as single chunk
+        if final and not self._advanced and n <= target_chars:
+            self._buf = ""
+            yield text
+            return
+
+        i = 0
+        while i < n:
+            # Calculate end position
+            j = min(i + target_chars, n)
+
+            # Until all text is in, only cut where more text can't change the result
+            if not final and j >= n - overlap:
+                break
+
+            # If we're near the end, just take the rest
+            if j >= n - overlap:
+                yield text[i:].strip()
+                i = n
+                break
+
             k = text.rfind('\n', i, j)
             if k != -1:
-                k += 1
+                # Prefer a paragraph boundary (double newline), else the
+                # single newline (no newline at all means no paragraph either)
+                p = text.rfind('\n\n', i, j)
+                k = p + 2 if p != -1 else k + 1
             else:
+                # Sentence / word cuts are only accepted within 180 chars of
+                # the window end, so only that tail is searched
+                tail = max(i, j - 180)
                 # Try to cut on sentence end
-                k = text.rfind('. ', i, j)
-                if k != -1 and j - k <= 180:
+                k = text.rfind('. ', tail, j)
+                if k != -1:
                     k += 2
                 else:
                     # Cut at word boundary
-                    k = text.rfind(' ', i, j)
-                    if k == -1 or j - k > 180:
+                    k = text.rfind(' ', tail, j)
+                    if k == -1:
                         k = j
-        
-        chunk = text[i:k].strip()
-        if chunk:  # Only yield non-empty chunks
-            yield chunk
-        
-        # Move forward, accounting for overlap
-        i = max(k - overlap, i + 1)
-        
-        # Safety check: ensure we're making progress
-        if i >= n:
-            break
+
+            chunk = text[i:k].strip()
+            if chunk:  # Only yield non-empty chunks
+                yield chunk
+
+            # Move forward, accounting for overlap
+            i = max(k - overlap, i + 1)
+            self._advanced = True
+
+        self._buf = text[i:]
+
+
+def iter_any(source: Source, mime: str, filename: str) -> Iterator[str]:
+    """
+    Extract a file's text in segments, picking the parser with file_kind;
+    PDFs are read page by page and DOCX paragraph by paragraph, so the whole
+    document text is never held at once.
+    """
+    kind = file_kind(mime, filename)
+    if kind == "pdf":
+        return iter_text_from_pdf(source)
+    if kind == "docx":
+        return iter_text_from_docx(source)
+    return iter([read_text_from_txt(source)])
+
+
+def file_kind(mime: str, filename: str) -> str:
+    """The parser iter_any uses for a file: 'pdf', 'docx' or 'txt'."""
+    name = filename.lower()
+    if name.endswith(".pdf") or mime == "application/pdf":
+        return "pdf"
+    if name.endswith(".docx") or mime in ("application/vnd.openxmlformats-officedocument.wordprocessingml.document",):
+        return "docx"
+    return "txt"
+
+def simple_chunks(text: Union[str, Iterable[str]], target_chars: int = 1200, overlap: int = 150):
+    """
+    Split text into chunks with overlap.
+    Improved to avoid creating too many tiny chunks.
+    Preserves line breaks for better structure.
+
+    text may be a string or an iterable of segments (see iter_any); segments
+    are chunked as they arrive.
+    """
+    chunker = TextChunker(target_chars, overlap)
+    for segment in ([text] if isinstance(text, str) else text):
+        yield from chunker.feed(segment)
+    yield from chunker.finish()
@@ -1,11 +1,12 @@
-import os, uuid, shutil, tempfile
+import asyncio
+import os
+import uuid
 from typing import List
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from sqlalchemy import text as sa_text
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, HTTPException
 
-from .db import SessionLocal
-from .text_extraction import read_any, simple_chunks
-from .embedding import embed_texts
+from .services.document_service import extract_files, index_documents, insert_documents
+from .services.rag_service import clear_answer_cache
+from .state import bump_corpus_version, mark_has_documents
 
 router = APIRouter(prefix="/api", tags=["documents"])
 
@@ -14,7 +15,7 @@ MAX_FILES_PER_UPLOAD = 5
 MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024  # 5 MB per file
 
 @router.post("/documents/upload")
-async def upload(files: List[UploadFile] = File(...)):
+async def upload(background: BackgroundTasks, files: List[UploadFile] = File(...)):
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
 
@@ -25,10 +26,12 @@ async def upload(files: List[UploadFile] = File(...)):
             detail=f"Too many files. Maximum {MAX_FILES_PER_UPLOAD} files per upload."
         )
 
-    inserted = []
-    with SessionLocal() as db, db.begin():
-        for f in files:
-            #Check file size before reading
+    #Check file sizes before reading anything
+    for f in files:
+        # The multipart parser records the size while spooling the upload;
+        # only measure the file when it didn't
+        size_bytes = f.size
+        if size_bytes is None:
             try:
                 f.file.seek(0, os.SEEK_END)
                 size_bytes = f.file.tell()
@@ -36,60 +39,30 @@ async def upload(files: List[UploadFile] = File(...)):
             except Exception:
                 size_bytes = 0 ## forcing to throw error
 
-            if size_bytes > MAX_FILE_SIZE_BYTES:
-                raise HTTPException(
-                    status_code=400,
-                    detail=(
-                        f"File '{f.filename}' is too large. "
-                        f"Max size is {MAX_FILE_SIZE_BYTES // (1024*1024)} MB."
-                    ),
-                )
-
-            # save to temp & read text
-            with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                shutil.copyfileobj(f.file, tmp)
-                tmp_path = tmp.name
-
-            try:
-                doc_text, kind = read_any(tmp_path, f.content_type or "", f.filename)
-            finally:
-                try:
-                    os.remove(tmp_path)
-                except:
-                    pass
-
-            if not doc_text.strip():
-                # skip empty docs (no extractable text)
-                continue
-
-            doc_id = str(uuid.uuid4())
-            db.execute(
-                sa_text("""
-                    INSERT INTO documents(id, filename, mime_type, size_bytes)
-                    VALUES(:id, :fn, :mt, :sz)
-                """),
-                {"id": doc_id, "fn": f.filename, "mt": f.content_type or "", "sz": getattr(f, "size", 0) or 0},
+        if size_bytes > MAX_FILE_SIZE_BYTES:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"File '{f.filename}' is too large. "
+                    f"Max size is {MAX_FILE_SIZE_BYTES // (1024*1024)} MB."
+                ),
             )
 
-            # chunk → embed → insert
-            parts = list(simple_chunks(doc_text))
-            vecs = embed_texts(parts)
+    # Files are parsed now (the upload streams close with the request);
+    # embedding and storing the chunks runs after the response is sent
+    docs = await extract_files(files)
+    if not docs:
+        return {"ok": True, "inserted": []}
 
-            for i, (chunk, vec) in enumerate(zip(parts, vecs)):
-                db.execute(
-                    sa_text("""
-                        INSERT INTO chunks(id, document_id, chunk_index, content, embedding)
-                        VALUES(:id, :doc, :idx, :content, :emb)
-                    """),
-                    {
-                        "id": str(uuid.uuid4()),
-                        "doc": doc_id,
-                        "idx": i,
-                        "content": chunk,
-                        "emb": vec,
-                    },
-                )
+    doc_ids, inserted = await asyncio.to_thread(insert_documents, docs)
+    background.add_task(_index_upload, doc_ids, [parts for _, parts in docs])
+    return {"ok": True, "inserted": inserted}
 
-            inserted.append({"document_id": doc_id, "filename": f.filename, "chunks": len(parts)})
 
-    return {"ok": True, "inserted": inserted}
+async def _index_upload(doc_ids: List[uuid.UUID], parts_per_doc: List[List[str]]):
+    """Background task: index an upload's chunks, then publish the new documents."""
+    if await index_documents(doc_ids, parts_per_doc):
+        # New documents can change answers to previously asked questions
+        clear_answer_cache()
+        mark_has_documents()
+        bump_corpus_version()
@@ -1,7 +1,37 @@
 """
 Utility helper functions.
 """
-from typing import List, Dict
+import os
+import time
+import uuid
+from typing import List, Dict, Tuple
+
+
+def uuid7_batch(n: int) -> List[uuid.UUID]:
+    """
+    Generate n time-ordered UUIDv7s (RFC 9562) from one clock read and one
+    os.urandom call.
+    
+    The leading 48-bit millisecond timestamp makes ids generated in sequence
+    sort together, so inserts append to the right edge of B-tree indexes
+    instead of landing on random pages like uuid4. The 60-bit timestamp
+    field (ms + sub-ms fraction) is incremented per id, so the batch sorts
+    in generation order even past 4096 ids per millisecond; the random bits
+    are sliced from a single buffer.
+    
+    Layout: unix_ts_ms (48) | ver=7 (4) | sub-ms fraction (12) | var=0b10 (2) | random (62)
+    """
+    ns = time.time_ns()
+    ms, rem = divmod(ns, 1_000_000)
+    base = (ms << 12) | (rem * 4096 // 1_000_000)
+    rand = os.urandom(8 * n)
+    ids = []
+    for i in range(n):
+        ts = base + i
+        tail = int.from_bytes(rand[8 * i:8 * i + 8], "big") & 0x3FFF_FFFF_FFFF_FFFF
+        value = ((ts >> 12) << 80) | (0x7 << 76) | ((ts & 0xFFF) << 64) | (0b10 << 62) | tail
+        ids.append(uuid.UUID(int=value))
+    return ids
 
 
 def dedupe_sources(chunks: List[Dict]) -> List[Dict]:
@@ -13,7 +43,7 @@ def dedupe_sources(chunks: List[Dict]) -> List[Dict]:
     Returns sources sorted by score (descending).
     
     Args:
-        chunks: List of chunks with 'filename', 'score', and 'content' keys
+        chunks: List of chunks with 'filename', 'score' (float), and 'content' keys
         
     Returns:
         List of deduplicated sources with filename, score, and content preview
@@ -30,32 +60,30 @@ def dedupe_sources(chunks: List[Dict]) -> List[Dict]:
             {"filename": "doc2.txt", "score": 0.7, "preview": "More text..."}
         ]
     """
-    source_map = {}
+    # filename -> (score, content) of its highest scoring chunk
+    best: Dict[str, Tuple[float, str]] = {}
     
     for chunk in chunks:
         filename = chunk["filename"]
-        score = float(chunk["score"])
-        content = chunk.get("content", "")
-        
-        # Keep highest score for each filename along with its content
-        if filename not in source_map or score > source_map[filename]["score"]:
-            source_map[filename] = {
-                "score": score,
-                "content": content
-            }
-    
-    # Convert to list and sort by score (descending)
+        score = chunk["score"]
+        current = best.get(filename)
+        if current is None or score > current[0]:
+            best[filename] = (score, chunk.get("content", ""))
+    
+    # Order by score (descending); ties keep retrieval order
+    items = sorted(best.items(), key=lambda kv: kv[1][0], reverse=True)
+    
     sources = []
-    for fname, data in sorted(source_map.items(), key=lambda x: x[1]["score"], reverse=True):
+    for fname, (score, content) in items:
         # Create preview (first 200 chars)
-        preview = data["content"][:200].strip()
-        if len(data["content"]) > 200:
+        preview = content[:200].strip()
+        if len(content) > 200:
             preview += "..."
         
         sources.append({
             "filename": fname,
-            "score": round(data["score"], 3),
+            "score": round(score, 3),
             "preview": preview
         })
     
-    return sources
\ No newline at end of file
+    return sources
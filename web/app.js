@@ -31,6 +31,11 @@ let pendingFiles = [];
 let isStreaming = false;
 let currentChatId = null; // 🔹 Track current conversation ID
 let timestampUpdateInterval = null; // 🔹 Interval for updating timestamps
+let docsPollTimeout = null; // 🔹 Re-check the list while documents are indexing
+let docsPollDelay = 2000; // 🔹 Backs off while documents stay in 'processing'
+const DOCS_POLL_MAX_DELAY = 30000;
+const DOCS_POLL_MAX_ATTEMPTS = 20;
+let docsPollAttempts = 0;
 
 // ==================== Timestamp Formatting ====================
 function formatTimestamp(isoString) {
@@ -587,6 +592,19 @@ async function refreshDocs() {
     if (!res.ok) throw new Error('Failed to fetch documents');
     
     const docs = await res.json();
+    
+    // Uploads are indexed in the background; poll with backoff until every
+    // document is done, giving up after a bounded number of attempts
+    clearTimeout(docsPollTimeout);
+    if (docs.some(doc => doc.status === 'processing') && docsPollAttempts < DOCS_POLL_MAX_ATTEMPTS) {
+      docsPollTimeout = setTimeout(refreshDocs, docsPollDelay);
+      docsPollAttempts += 1;
+      docsPollDelay = Math.min(docsPollDelay * 2, DOCS_POLL_MAX_DELAY);
+    } else {
+      docsPollAttempts = 0;
+      docsPollDelay = 2000;
+    }
+    
     docCount.textContent = `${docs.length} ${docs.length === 1 ? 'document' : 'documents'}`;
     
     if (docs.length === 0) {
@@ -611,6 +629,8 @@ async function refreshDocs() {
         day: 'numeric',
         year: 'numeric'
       });
+      const statusLabel = doc.status === 'processing' ? 'Indexing…'
+        : doc.status === 'failed' ? 'Indexing failed' : '';
       
       return `
         <div class="doc-item" data-doc-id="${doc.id}">
@@ -629,6 +649,7 @@ async function refreshDocs() {
               <span>${(doc.size_bytes / 1024).toFixed(1)} KB</span>
               <span class="doc-divider">•</span>
               <span>${formattedDate}</span>
+              ${statusLabel ? `<span class="doc-divider">•</span><span class="doc-status ${doc.status}">${statusLabel}</span>` : ''}
             </div>
           </div>
           <button class="doc-delete" data-doc-id="${doc.id}" title="Delete document">
@@ -841,9 +862,12 @@ uploadBtn.addEventListener('click', async () => {
         throw new Error(msg);
     }
     
-    showStatus('✓ Documents uploaded and indexed successfully', 'success');
+    showStatus('✓ Documents uploaded — indexing in the background', 'success');
     pendingFiles = [];
     renderFilesList();
+    // New uploads start indexing now; restart the polling backoff
+    docsPollAttempts = 0;
+    docsPollDelay = 2000;
     await refreshDocs();
   } catch (e) {
     console.error('Upload error:', e);